@@ -3,21 +3,20 @@
 CLI script to compare two dataset versions.
 
 Usage:
-    python compare_versions.py --from v1 --to v2 [--output version_comparison.json]
+    python compare_versions.py --from v1 --to v2 [--output version_comparison.json] [--no-samples]
 """
 
 import os
 import sys
-import json
 import argparse
 import logging
+from functools import lru_cache
+from typing import List, Optional
 
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils import setup_logging, load_config
-from version_manager import VersionManager
-from comparison import VersionComparator
+from utils import setup_logging, load_config_cached
 
 
 def print_comparison_summary(comparison: dict) -> None:
@@ -27,63 +26,72 @@ def print_comparison_summary(comparison: dict) -> None:
     Args:
         comparison: Comparison dictionary
     """
-    print("\n" + "=" * 60)
-    print("Version Comparison Summary")
-    print("=" * 60)
+    lines = []
     
-    print(f"\nComparing: {comparison['version1']} → {comparison['version2']}")
-    print(f"Comparison Time: {comparison['comparison_timestamp']}")
+    lines.append("\n" + "=" * 60)
+    lines.append("Version Comparison Summary")
+    lines.append("=" * 60)
+    
+    lines.append(f"\nComparing: {comparison['version1']} → {comparison['version2']}")
+    lines.append(f"Comparison Time: {comparison['comparison_timestamp']}")
     
     # Row count comparison
     if "row_count_comparison" in comparison:
         rc = comparison["row_count_comparison"]
-        print(f"\nRow Count:")
-        print(f"  {comparison['version1']}: {rc['version1_row_count']:,} rows")
-        print(f"  {comparison['version2']}: {rc['version2_row_count']:,} rows")
-        print(f"  Change: {rc['difference']:+,} ({rc['percentage_change']:+.2f}%)")
+        lines.append(f"\nRow Count:")
+        lines.append(f"  {comparison['version1']}: {rc['version1_row_count']:,} rows")
+        lines.append(f"  {comparison['version2']}: {rc['version2_row_count']:,} rows")
+        lines.append(f"  Change: {rc['difference']:+,} ({rc['percentage_change']:+.2f}%)")
     
     # Column comparison
     if "column_comparison" in comparison:
         cc = comparison["column_comparison"]
-        print(f"\nColumns:")
-        print(f"  {comparison['version1']}: {cc['version1_column_count']} columns")
-        print(f"  {comparison['version2']}: {cc['version2_column_count']} columns")
+        lines.append(f"\nColumns:")
+        lines.append(f"  {comparison['version1']}: {cc['version1_column_count']} columns")
+        lines.append(f"  {comparison['version2']}: {cc['version2_column_count']} columns")
         
         if cc['columns_added_count'] > 0:
-            print(f"  Added: {cc['columns_added_count']} columns")
-            if cc['added_columns']:
-                print(f"    {', '.join(cc['added_columns'][:3])}{'...' if len(cc['added_columns']) > 3 else ''}")
+            lines.append(f"  Added: {cc['columns_added_count']} columns")
+            if cc['added_columns_sample']:
+                lines.append(f"    {', '.join(cc['added_columns_sample'])}{'...' if cc['columns_added_count'] > len(cc['added_columns_sample']) else ''}")
         
         if cc['columns_removed_count'] > 0:
-            print(f"  Removed: {cc['columns_removed_count']} columns")
-            if cc['removed_columns']:
-                print(f"    {', '.join(cc['removed_columns'][:3])}{'...' if len(cc['removed_columns']) > 3 else ''}")
+            lines.append(f"  Removed: {cc['columns_removed_count']} columns")
+            if cc['removed_columns_sample']:
+                lines.append(f"    {', '.join(cc['removed_columns_sample'])}{'...' if cc['columns_removed_count'] > len(cc['removed_columns_sample']) else ''}")
     
     # Data type comparison
     if "data_type_comparison" in comparison:
         dtc = comparison["data_type_comparison"]
         if dtc['total_changes'] > 0:
-            print(f"\nData Type Changes: {dtc['total_changes']}")
+            lines.append(f"\nData Type Changes: {dtc['total_changes']}")
             for col, change in list(dtc['changed_columns'].items())[:3]:
-                print(f"  {col}: {change['version1_type']} → {change['version2_type']}")
+                lines.append(f"  {col}: {change['version1_type']} → {change['version2_type']}")
             if len(dtc['changed_columns']) > 3:
-                print(f"  ... and {len(dtc['changed_columns']) - 3} more")
+                lines.append(f"  ... and {len(dtc['changed_columns']) - 3} more")
     
     # Summary
     if "summary" in comparison:
         summary = comparison["summary"]
-        print(f"\nSummary:")
-        print(f"  Total Differences: {summary['total_differences']}")
+        lines.append(f"\nSummary:")
+        lines.append(f"  Total Differences: {summary['total_differences']}")
         for change in summary['key_changes']:
-            print(f"  • {change}")
+            lines.append(f"  • {change}")
+    
+    lines.append("\n" + "=" * 60)
     
-    print("\n" + "=" * 60)
+    # Emit the whole summary with a single write
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def main():
-    """Main entry point for compare_versions CLI."""
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser once per process.
     
-    # Parse command line arguments
+    Returns:
+        Configured argument parser
+    """
     parser = argparse.ArgumentParser(
         description="Compare two dataset versions",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -91,6 +99,9 @@ def main():
 Examples:
   python compare_versions.py --from v1 --to v2
   python compare_versions.py --from v1 --to v2 --output comparison.json
+  python compare_versions.py --from v1 --to v2 --no-samples
+  python compare_versions.py --from v1 --to v2 --full-column-lists
+  python compare_versions.py --from v1 --to v2 --format parquet
   python compare_versions.py --from v1 --to v2 --config config/versioning_config.yaml
         """
     )
@@ -115,6 +126,25 @@ Examples:
         help='Output file for comparison report (default: data/version_comparison.json)'
     )
     
+    parser.add_argument(
+        '--format',
+        choices=['json', 'parquet'],
+        default='json',
+        help='Report format; parquet stores changed data types as a table (default: json)'
+    )
+    
+    parser.add_argument(
+        '--no-samples',
+        action='store_true',
+        help='Skip reading sample rows from both datasets'
+    )
+    
+    parser.add_argument(
+        '--full-column-lists',
+        action='store_true',
+        help='Include every added/removed column name in the report, not just a preview'
+    )
+    
     parser.add_argument(
         '--config', '-c',
         default='config/versioning_config.yaml',
@@ -127,11 +157,42 @@ Examples:
         help='Enable verbose logging'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for compare_versions CLI.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit code
+    """
+    
+    # Parse command line arguments
+    args = _build_parser().parse_args(argv)
+    
+    # Imported after argument parsing so --help and usage errors stay fast
+    from version_manager import VersionManager
+    from comparison import VersionComparator
     
     try:
         # Load configuration
-        config = load_config(args.config)
+        config = load_config_cached(args.config)
+        
+        # The cached config is shared, so apply CLI overrides to a copy
+        comparison_overrides = {}
+        if args.no_samples:
+            comparison_overrides['include_sample_data'] = False
+        if args.full_column_lists:
+            comparison_overrides['include_full_column_lists'] = True
+        if comparison_overrides:
+            config = {
+                **config,
+                'comparison': {**config['comparison'], **comparison_overrides}
+            }
         
         # Setup logging
         logger = setup_logging(config, "CompareVersions")
@@ -144,22 +205,18 @@ Examples:
         logger.info("=" * 60)
         
         # Initialize version manager
-        version_manager = VersionManager(args.config, logger)
+        version_manager = VersionManager(args.config, logger, config=config)
         
         # Check if versions exist
         all_versions = version_manager.get_all_versions()
+        known_versions = set(all_versions)
         
-        if args.from_version not in all_versions:
-            logger.error(f"Version '{args.from_version}' not found")
-            print(f"ERROR: Version '{args.from_version}' not found")
-            print(f"Available versions: {', '.join(all_versions)}")
-            return 1
-        
-        if args.to_version not in all_versions:
-            logger.error(f"Version '{args.to_version}' not found")
-            print(f"ERROR: Version '{args.to_version}' not found")
-            print(f"Available versions: {', '.join(all_versions)}")
-            return 1
+        for version in (args.from_version, args.to_version):
+            if version not in known_versions:
+                logger.error(f"Version '{version}' not found")
+                print(f"ERROR: Version '{version}' not found")
+                print(f"Available versions: {', '.join(all_versions)}")
+                return 1
         
         logger.info(f"Comparing {args.from_version} and {args.to_version}")
         
@@ -170,6 +227,8 @@ Examples:
         comparison = comparator.compare_versions(args.from_version, args.to_version)
         
         # Save comparison report
+        if args.format == 'parquet' and not args.output.endswith('.parquet'):
+            args.output = os.path.splitext(args.output)[0] + '.parquet'
         os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
         comparator.save_comparison(comparison, args.output)
         
@@ -3,14 +3,56 @@ Version comparison logic for the data versioning system.
 Compares versions and generates detailed comparison reports.
 """
 
+import io
 import os
 import csv
+import json
+import mmap
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Set
 
-from utils import load_json, save_json, get_timestamp
+from utils import load_json, save_json, get_timestamp, ensure_directory
 from version_manager import VersionManager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+# Block size for the pyarrow CSV reader; one block covers typical samples
+CSV_SAMPLE_BLOCK_SIZE = 1 << 20
+
+# Samples up to this many rows are read by scanning a memory map for newlines
+MMAP_SAMPLE_MAX_ROWS = 50
+
+# Number of added/removed column names kept as a preview in reports
+COLUMN_SAMPLE_SIZE = 3
+
+# Row count change direction, indexed by sign(difference) + 1
+ROW_COUNT_DIRECTIONS = ("decrease", "no change", "increase")
+
+# Bump when the layout of cached comparison sections changes
+COMPARISON_CACHE_VERSION = 3
+
+# Version metadata fields the cached comparison sections are computed from
+CACHED_METADATA_FIELDS = ("row_count", "columns", "data_types")
+
+# Report fields that describe the request rather than the dataset contents
+REPORT_HEADER_KEYS = (
+    "comparison_timestamp", "version1", "version2",
+    "version1_created_at", "version2_created_at"
+)
+
 
 class VersionComparator:
     """
@@ -45,13 +87,10 @@ class VersionComparator:
         """
         self.logger.info(f"Comparing versions {version1} and {version2}")
         
-        # Get metadata for both versions
-        metadata1 = self.version_manager.get_version_metadata(version1)
-        metadata2 = self.version_manager.get_version_metadata(version2)
-        
-        # Get dataset paths
-        dataset_path1 = self.version_manager.get_version_dataset_path(version1)
-        dataset_path2 = self.version_manager.get_version_dataset_path(version2)
+        # Get metadata and dataset paths for both versions
+        versions = self.version_manager.get_versions_bulk([version1, version2])
+        metadata1, dataset_path1 = versions[version1]
+        metadata2, dataset_path2 = versions[version2]
         
         comparison = {
             "comparison_timestamp": get_timestamp(),
@@ -61,6 +100,15 @@ class VersionComparator:
             "version2_created_at": metadata2.get("created_at"),
         }
         
+        # Reuse a previous comparison of the same dataset contents
+        cache_file = self._get_cache_file(metadata1, metadata2)
+        if cache_file is not None:
+            cached = self._load_cached_comparison(cache_file)
+            if cached is not None:
+                comparison.update(cached)
+                self.logger.info(f"Using cached comparison for {version1} and {version2}")
+                return comparison
+        
         # Compare row counts
         if self.config['comparison']['compare_row_count']:
             comparison["row_count_comparison"] = self._compare_row_counts(
@@ -88,10 +136,87 @@ class VersionComparator:
         # Add summary
         comparison["summary"] = self._generate_summary(comparison)
         
+        if cache_file is not None:
+            self._save_cached_comparison(comparison, cache_file)
+        
         self.logger.info(f"Comparison complete for {version1} and {version2}")
         
         return comparison
     
+    def _get_cache_file(self, metadata1: Dict[str, Any], metadata2: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the cache file for a comparison of two dataset contents.
+        
+        The key is the ordered pair of file hashes plus a digest of the
+        comparison settings and of the metadata fields the report is built
+        from (row count, columns, data types), since all of these change the
+        report contents. The metadata depends on the metadata settings that
+        were in effect, not only on the file contents.
+        
+        Args:
+            metadata1: Metadata of first version
+            metadata2: Metadata of second version
+            
+        Returns:
+            Path to the cache file, or None if caching is disabled or unavailable
+        """
+        if not self.config['comparison'].get('cache_results', False):
+            return None
+        
+        hash1 = metadata1.get("file_hash")
+        hash2 = metadata2.get("file_hash")
+        if not hash1 or not hash2:
+            return None
+        
+        metadata_fields = [
+            [metadata.get(field) for field in CACHED_METADATA_FIELDS]
+            for metadata in (metadata1, metadata2)
+        ]
+        key_data = json.dumps(
+            [COMPARISON_CACHE_VERSION, self.config['comparison'], metadata_fields],
+            sort_keys=True, default=str
+        )
+        key_digest = hashlib.sha256(key_data.encode('utf-8')).hexdigest()[:16]
+        
+        cache_dir = self.config['storage'].get('comparison_cache_dir', 'cache/comparisons')
+        return os.path.join(cache_dir, f"{hash1}_{hash2}_{key_digest}.json")
+    
+    def _load_cached_comparison(self, cache_file: str) -> Optional[Dict[str, Any]]:
+        """
+        Load cached comparison sections.
+        
+        Args:
+            cache_file: Path to the cache file
+            
+        Returns:
+            Cached comparison sections, or None on a cache miss
+        """
+        try:
+            return load_json(cache_file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable comparison cache {cache_file}: {str(e)}")
+            return None
+    
+    def _save_cached_comparison(self, comparison: Dict[str, Any], cache_file: str) -> None:
+        """
+        Save the content-derived sections of a comparison to the cache.
+        
+        Args:
+            comparison: Comparison dictionary
+            cache_file: Path to the cache file
+        """
+        sections = {
+            key: value for key, value in comparison.items()
+            if key not in REPORT_HEADER_KEYS
+        }
+        
+        try:
+            save_json(sections, cache_file)
+        except Exception as e:
+            self.logger.warning(f"Failed to cache comparison: {str(e)}")
+    
     def _compare_row_counts(self, metadata1: Dict[str, Any], metadata2: Dict[str, Any]) -> Dict[str, Any]:
         """
         Compare row counts between two versions.
@@ -107,14 +232,20 @@ class VersionComparator:
         row_count2 = metadata2.get("row_count", 0)
         
         difference = row_count2 - row_count1
-        percentage_change = (difference / row_count1 * 100) if row_count1 > 0 else 0
+        
+        # Percentage in hundredths, rounded half up in integer arithmetic
+        if row_count1 > 0:
+            scaled_change = (difference * 20000 + row_count1) // (2 * row_count1)
+            percentage_change = scaled_change / 100
+        else:
+            percentage_change = 0.0
         
         return {
             "version1_row_count": row_count1,
             "version2_row_count": row_count2,
             "difference": difference,
-            "percentage_change": round(percentage_change, 2),
-            "direction": "increase" if difference > 0 else ("decrease" if difference < 0 else "no change")
+            "percentage_change": percentage_change,
+            "direction": ROW_COUNT_DIRECTIONS[(difference > 0) - (difference < 0) + 1]
         }
     
     def _compare_columns(
@@ -136,22 +267,34 @@ class VersionComparator:
         Returns:
             Column comparison dictionary
         """
-        columns1 = set(metadata1.get("columns", []))
-        columns2 = set(metadata2.get("columns", []))
+        column_list1 = metadata1.get("columns", [])
+        column_list2 = metadata2.get("columns", [])
+        columns1 = frozenset(column_list1)
+        columns2 = frozenset(column_list2)
         
-        added_columns = list(columns2 - columns1)
-        removed_columns = list(columns1 - columns2)
-        common_columns = list(columns1 & columns2)
+        added_columns = columns2 - columns1
+        removed_columns = columns1 - columns2
         
-        return {
+        column_comparison = {
             "version1_column_count": len(columns1),
             "version2_column_count": len(columns2),
-            "added_columns": added_columns,
-            "removed_columns": removed_columns,
-            "common_columns": common_columns,
             "columns_added_count": len(added_columns),
-            "columns_removed_count": len(removed_columns)
+            "columns_removed_count": len(removed_columns),
+            # Samples keep schema order and stop after COLUMN_SAMPLE_SIZE items
+            "added_columns_sample": list(islice(
+                (col for col in column_list2 if col in added_columns), COLUMN_SAMPLE_SIZE
+            )),
+            "removed_columns_sample": list(islice(
+                (col for col in column_list1 if col in removed_columns), COLUMN_SAMPLE_SIZE
+            ))
         }
+        
+        # Full lists grow with the schema, so they are opt-in
+        if self.config['comparison'].get('include_full_column_lists', False):
+            column_comparison["added_columns"] = [col for col in column_list2 if col in added_columns]
+            column_comparison["removed_columns"] = [col for col in column_list1 if col in removed_columns]
+        
+        return column_comparison
     
     def _compare_data_types(
         self,
@@ -171,14 +314,13 @@ class VersionComparator:
         types1 = metadata1.get("data_types", {})
         types2 = metadata2.get("data_types", {})
         
-        changed_types = {}
-        
-        for column in types1:
-            if column in types2 and types1[column] != types2[column]:
-                changed_types[column] = {
-                    "version1_type": types1[column],
-                    "version2_type": types2[column]
-                }
+        # One hash lookup per column; iterating types1 keeps report order stable
+        get_type2 = types2.get
+        changed_types = {
+            column: {"version1_type": type1, "version2_type": type2}
+            for column, type1 in types1.items()
+            if (type2 := get_type2(column)) is not None and type1 != type2
+        }
         
         return {
             "changed_columns": changed_types,
@@ -198,8 +340,11 @@ class VersionComparator:
         """
         sample_size = self.config['comparison']['sample_size']
         
-        sample1 = self._read_csv_sample(dataset_path1, sample_size)
-        sample2 = self._read_csv_sample(dataset_path2, sample_size)
+        # Both reads are I/O-bound, so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future1 = executor.submit(self._read_csv_sample, dataset_path1, sample_size)
+            future2 = executor.submit(self._read_csv_sample, dataset_path2, sample_size)
+            sample1, sample2 = future1.result(), future2.result()
         
         return {
             "version1_sample": sample1,
@@ -211,6 +356,10 @@ class VersionComparator:
         """
         Read sample rows from a CSV file.
         
+        Small samples are cut from a memory map so only the first pages of
+        the file are touched. Larger samples use the pyarrow streaming reader
+        when available, falling back to the csv module otherwise.
+        
         Args:
             csv_path: Path to the CSV file
             sample_size: Number of rows to read
@@ -218,21 +367,138 @@ class VersionComparator:
         Returns:
             List of sample rows as dictionaries
         """
-        sample = []
+        if sample_size <= MMAP_SAMPLE_MAX_ROWS:
+            try:
+                return self._read_csv_sample_mmap(csv_path, sample_size)
+            except Exception as e:
+                self.logger.debug(f"mmap sample read failed, using streaming reader: {str(e)}")
+        
+        if pacsv is not None:
+            try:
+                return self._read_csv_sample_arrow(csv_path, sample_size)
+            except Exception as e:
+                self.logger.debug(f"pyarrow sample read failed, using csv module: {str(e)}")
         
         try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for i, row in enumerate(reader):
-                    if i >= sample_size:
-                        break
-                    sample.append(row)
+            with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                rows = list(islice((row for row in reader if row), sample_size))
         except Exception as e:
             self.logger.warning(f"Error reading CSV sample: {str(e)}")
+            return []
+        
+        return [dict(zip(header, row)) for row in rows]
+    
+    def _read_csv_sample_mmap(self, csv_path: str, sample_size: int) -> List[Dict[str, str]]:
+        """
+        Read sample rows from a CSV file through a memory map.
+        
+        Lines are taken from the map and decoded one at a time, and the csv
+        module finds the record ends, so quoted fields spanning lines are
+        read whole. Reading stops after the last sampled record, so only the
+        first pages of the file are touched.
+        
+        Args:
+            csv_path: Path to the CSV file
+            sample_size: Number of rows to read
+            
+        Returns:
+            List of sample rows as dictionaries
+            
+        Raises:
+            ValueError: If a line isn't valid UTF-8 or has a carriage return
+                that isn't part of its line ending
+        """
+        with open(csv_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                reader = csv.reader(self._iter_mmap_lines(mm))
+                header = next(reader, [])
+                rows = list(islice((row for row in reader if row), sample_size))
+        
+        return [dict(zip(header, row)) for row in rows]
+    
+    @staticmethod
+    def _iter_mmap_lines(mm: mmap.mmap) -> Iterator[str]:
+        """
+        Yield the decoded lines of a memory map, split on newlines.
+        
+        Text files opened with newline='' also end lines at a lone carriage
+        return; such lines are rejected rather than split differently.
+        
+        Args:
+            mm: Memory map of the CSV file
+            
+        Yields:
+            Lines with their line endings
+            
+        Raises:
+            ValueError: If a line isn't valid UTF-8 or has a lone carriage return
+        """
+        for raw in iter(mm.readline, b''):
+            line = raw.decode('utf-8')
+            if line.endswith('\r\n'):
+                body = line[:-2]
+            elif line.endswith(('\n', '\r')):
+                body = line[:-1]
+            else:
+                body = line
+            if '\r' in body:
+                raise ValueError("Lone carriage return in CSV line")
+            yield line
+    
+    def _read_csv_sample_arrow(self, csv_path: str, sample_size: int) -> List[Dict[str, str]]:
+        """
+        Read sample rows from a CSV file with the pyarrow streaming reader.
+        
+        All columns are read as strings to match the csv module output. The
+        column names are the csv module's header (pyarrow's header row is
+        skipped), so they match the fallback path even when pyarrow would
+        strip a UTF-8 BOM from the first name.
+        
+        Args:
+            csv_path: Path to the CSV file
+            sample_size: Number of rows to read
+            
+        Returns:
+            List of sample rows as dictionaries
+        """
+        # line_num counts the physical lines of a header with quoted newlines
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            header_reader = csv.reader(f)
+            header = next(header_reader, [])
+            header_lines = header_reader.line_num
+        
+        if not header or sample_size <= 0:
+            return []
+        
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(
+                block_size=CSV_SAMPLE_BLOCK_SIZE, column_names=header, skip_rows=header_lines
+            ),
+            convert_options=pacsv.ConvertOptions(
+                column_types={col: pa.string() for col in header}
+            )
+        )
+        
+        sample = []
+        try:
+            while len(sample) < sample_size:
+                try:
+                    batch = reader.read_next_batch()
+                except StopIteration:
+                    break
+                sample.extend(batch.slice(0, sample_size - len(sample)).to_pylist())
+        finally:
+            reader.close()
         
         return sample
     
-    def _generate_summary(self, comparison: Dict[str, Any]) -> Dict[str, str]:
+    def _generate_summary(self, comparison: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate a summary of the comparison.
         
@@ -242,54 +508,183 @@ class VersionComparator:
         Returns:
             Summary dictionary
         """
-        summary = {
-            "total_differences": 0,
-            "key_changes": []
+        key_changes = list(self._iter_key_changes(comparison))
+        
+        return {
+            "total_differences": len(key_changes),
+            "key_changes": key_changes or ["No significant differences found"]
         }
+    
+    @staticmethod
+    def _iter_key_changes(comparison: Dict[str, Any]) -> Iterator[str]:
+        """
+        Yield a description of each significant difference in a comparison.
         
-        # Count row changes
+        Args:
+            comparison: Comparison dictionary
+            
+        Yields:
+            Human-readable description of one difference
+        """
+        # Row changes
         if "row_count_comparison" in comparison:
-            row_diff = comparison["row_count_comparison"]["difference"]
-            if row_diff != 0:
-                summary["total_differences"] += 1
-                summary["key_changes"].append(
-                    f"Row count changed by {row_diff} "
-                    f"({comparison['row_count_comparison']['percentage_change']}%)"
+            row_comp = comparison["row_count_comparison"]
+            if row_comp["difference"] != 0:
+                yield (
+                    f"Row count changed by {row_comp['difference']} "
+                    f"({row_comp['percentage_change']}%)"
                 )
         
-        # Count column changes
+        # Column changes
         if "column_comparison" in comparison:
             col_comp = comparison["column_comparison"]
             if col_comp["columns_added_count"] > 0:
-                summary["total_differences"] += 1
-                summary["key_changes"].append(
-                    f"{col_comp['columns_added_count']} columns added"
-                )
+                yield f"{col_comp['columns_added_count']} columns added"
             if col_comp["columns_removed_count"] > 0:
-                summary["total_differences"] += 1
-                summary["key_changes"].append(
-                    f"{col_comp['columns_removed_count']} columns removed"
-                )
+                yield f"{col_comp['columns_removed_count']} columns removed"
         
-        # Count data type changes
+        # Data type changes
         if "data_type_comparison" in comparison:
             type_changes = comparison["data_type_comparison"]["total_changes"]
             if type_changes > 0:
-                summary["total_differences"] += 1
-                summary["key_changes"].append(f"{type_changes} data types changed")
-        
-        if summary["total_differences"] == 0:
-            summary["key_changes"].append("No significant differences found")
-        
-        return summary
+                yield f"{type_changes} data types changed"
     
     def save_comparison(self, comparison: Dict[str, Any], output_file: str) -> None:
         """
-        Save comparison report to a JSON file.
+        Save comparison report to a JSON or Parquet file.
+        
+        The format is chosen by the extension of output_file. If the file
+        already holds a report with the same contents (ignoring the
+        comparison timestamp), it is left as it is, so it keeps the
+        comparison_timestamp of the run that wrote it.
         
         Args:
             comparison: Comparison dictionary
             output_file: Path to save the comparison report
         """
-        save_json(comparison, output_file)
+        digest = self._report_digest(comparison)
+        if self._stored_report_digest(output_file) == digest:
+            self.logger.info(
+                f"Comparison report unchanged, keeping {output_file} "
+                f"(comparison_timestamp stays that of the earlier run)"
+            )
+            return
+        
+        if output_file.endswith('.parquet'):
+            self._save_comparison_parquet(comparison, output_file, digest)
+        else:
+            save_json(comparison, output_file)
+        
         self.logger.info(f"Comparison report saved to {output_file}")
+    
+    @staticmethod
+    def _report_digest(comparison: Dict[str, Any]) -> str:
+        """
+        Compute a digest of a comparison report's contents.
+        
+        The comparison timestamp is left out so re-running the same
+        comparison yields the same digest.
+        
+        Args:
+            comparison: Comparison dictionary
+            
+        Returns:
+            Hex digest of the report contents
+        """
+        contents = {
+            key: value for key, value in comparison.items()
+            if key != "comparison_timestamp"
+        }
+        
+        if orjson is not None:
+            payload = orjson.dumps(
+                contents, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+            )
+        else:
+            payload = json.dumps(contents, sort_keys=True, default=str).encode('utf-8')
+        
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _stored_report_digest(self, output_file: str) -> Optional[str]:
+        """
+        Get the digest of the report currently stored in output_file.
+        
+        JSON reports are read back and digested; Parquet reports carry the
+        digest of their contents in the schema metadata, written with them.
+        
+        Args:
+            output_file: Path of the comparison report
+            
+        Returns:
+            Digest of the stored report, or None if there is no readable report
+        """
+        try:
+            if output_file.endswith('.parquet'):
+                if pa is None:
+                    return None
+                import pyarrow.parquet as pq
+                metadata = pq.read_schema(output_file).metadata or {}
+                digest = metadata.get(b"report_digest")
+                return digest.decode('utf-8') if digest is not None else None
+            
+            return self._report_digest(load_json(output_file))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.debug(f"Could not read existing report {output_file}: {str(e)}")
+            return None
+    
+    def _save_comparison_parquet(
+        self,
+        comparison: Dict[str, Any],
+        output_file: str,
+        digest: Optional[str] = None
+    ) -> None:
+        """
+        Save comparison report to a Parquet file.
+        
+        Changed data types are stored as a table with columns (column,
+        version1_type, version2_type); the rest of the report is stored as
+        JSON under the "comparison" key of the file's schema metadata, next
+        to the report digest under "report_digest".
+        
+        Args:
+            comparison: Comparison dictionary
+            output_file: Path to save the comparison report
+            digest: Digest of the report contents (computed if not given)
+            
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required to save comparison reports as Parquet")
+        
+        import pyarrow.parquet as pq
+        
+        data_type_comparison = comparison.get("data_type_comparison", {})
+        changed_columns = data_type_comparison.get("changed_columns", {})
+        
+        table = pa.table({
+            "column": pa.array(list(changed_columns), type=pa.string()),
+            "version1_type": pa.array(
+                [change["version1_type"] for change in changed_columns.values()], type=pa.string()
+            ),
+            "version2_type": pa.array(
+                [change["version2_type"] for change in changed_columns.values()], type=pa.string()
+            ),
+        })
+        
+        report = dict(comparison)
+        if data_type_comparison:
+            report["data_type_comparison"] = {
+                key: value for key, value in data_type_comparison.items()
+                if key != "changed_columns"
+            }
+        
+        table = table.replace_schema_metadata({
+            "comparison": json.dumps(report, default=str),
+            "report_digest": digest or self._report_digest(comparison),
+        })
+        
+        ensure_directory(os.path.dirname(output_file))
+        pq.write_table(table, output_file, compression='zstd')
@@ -10,18 +10,23 @@ import os
 import sys
 import argparse
 import logging
+from functools import lru_cache
+from typing import List, Optional
 
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils import setup_logging, load_config
-from version_manager import VersionManager
+from utils import setup_logging, load_config_cached
 
 
-def main():
-    """Main entry point for create_version CLI."""
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser once per process.
     
-    # Parse command line arguments
+    Returns:
+        Configured argument parser
+    """
     parser = argparse.ArgumentParser(
         description="Create a new version of a dataset",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -58,11 +63,29 @@ Examples:
         help='Enable verbose logging'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for create_version CLI.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit code
+    """
+    
+    # Parse command line arguments
+    args = _build_parser().parse_args(argv)
+    
+    # Imported after argument parsing so --help and usage errors stay fast
+    from version_manager import VersionManager
     
     try:
         # Load configuration
-        config = load_config(args.config)
+        config = load_config_cached(args.config)
         
         # Setup logging
         logger = setup_logging(config, "CreateVersion")
@@ -75,7 +98,9 @@ Examples:
         logger.info("=" * 60)
         
         # Validate input file
-        if not os.path.exists(args.input):
+        try:
+            input_stat = os.stat(args.input)
+        except FileNotFoundError:
             logger.error(f"Input file not found: {args.input}")
             print(f"ERROR: Input file not found: {args.input}")
             return 1
@@ -91,16 +116,20 @@ Examples:
             logger.info(f"Quality score: {args.quality_score}")
         
         # Initialize version manager
-        version_manager = VersionManager(args.config, logger)
+        version_manager = VersionManager(args.config, logger, config=config)
         
         # Create version
         version_name = version_manager.create_version(
             input_file=args.input,
-            quality_score=args.quality_score
+            quality_score=args.quality_score,
+            input_stat=input_stat
         )
         
         # Get metadata
         metadata = version_manager.get_version_metadata(version_name)
+        if metadata is None:
+            print(f"ERROR: Metadata not available for {version_name}")
+            return 1
         
         # Print success message
         print("\n" + "=" * 60)
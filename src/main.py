@@ -13,18 +13,18 @@ Usage:
 
 import os
 import sys
-import json
 import argparse
 import logging
-from pathlib import Path
+from functools import lru_cache
+from typing import List, Optional
 
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils import setup_logging, load_config
-from version_manager import VersionManager
-from comparison import VersionComparator
-from rollback import RollbackManager
+from utils import setup_logging, load_config_cached
+
+# Answers accepted as confirmation (compared after strip().lower())
+CONFIRM_RESPONSES = frozenset({'yes', 'y'})
 
 
 def cmd_create(args, version_manager, logger):
@@ -40,6 +40,9 @@ def cmd_create(args, version_manager, logger):
         )
         
         metadata = version_manager.get_version_metadata(version_name)
+        if metadata is None:
+            print(f"ERROR: Metadata not available for {version_name}")
+            return 1
         
         print("\n✓ Version created successfully!")
         print(f"Version: {version_name}")
@@ -56,6 +59,8 @@ def cmd_create(args, version_manager, logger):
 
 def cmd_compare(args, version_manager, logger):
     """Handle compare command."""
+    from comparison import VersionComparator
+    
     try:
         all_versions = version_manager.get_all_versions()
         
@@ -99,26 +104,34 @@ def cmd_compare(args, version_manager, logger):
 
 def cmd_rollback(args, version_manager, logger):
     """Handle rollback command."""
+    from rollback import RollbackManager
+    
     try:
         rollback_manager = RollbackManager(version_manager, logger)
         
-        is_safe, reason = rollback_manager.is_safe_to_rollback(args.to_version)
+        # Read the version state once and share it with both checks
+        all_versions, current_version = version_manager.get_state()
+        
+        is_safe, reason = rollback_manager.is_safe_to_rollback(
+            args.to_version, all_versions=all_versions, current_version=current_version
+        )
         
         if not is_safe:
             print(f"ERROR: {reason}")
             return 1
         
-        current_version = version_manager.get_current_version()
-        
         print(f"\nRollback: {current_version} → {args.to_version}")
         
         if not args.force:
             response = input("Proceed? (yes/no): ").strip().lower()
-            if response not in ['yes', 'y']:
+            if response not in CONFIRM_RESPONSES:
                 print("Cancelled")
                 return 0
         
-        rollback_manager.rollback_to_version(args.to_version, create_backup=True)
+        # Already validated by is_safe_to_rollback above
+        rollback_manager._rollback_to_version_unchecked(
+            args.to_version, current_version, create_backup=True
+        )
         
         print("✓ Rollback completed!")
         
@@ -132,26 +145,29 @@ def cmd_rollback(args, version_manager, logger):
 def cmd_list(args, version_manager, logger):
     """Handle list command."""
     try:
-        all_versions = version_manager.get_all_versions()
-        current_version = version_manager.get_current_version()
+        all_versions, current_version = version_manager.get_state()
         
-        print("\nAvailable Versions:")
-        print("-" * 60)
+        lines = ["\nAvailable Versions:", "-" * 60]
         
         if not all_versions:
-            print("No versions found")
+            lines.append("No versions found")
         else:
+            summaries = version_manager.get_version_summaries(all_versions)
+            
             for version in all_versions:
                 marker = " ← CURRENT" if version == current_version else ""
-                try:
-                    metadata = version_manager.get_version_metadata(version)
-                    created_at = metadata.get('created_at', 'N/A')
-                    row_count = metadata.get('row_count', 'N/A')
-                    print(f"{version}: {created_at} ({row_count} rows){marker}")
-                except:
-                    print(f"{version}: Error reading metadata{marker}")
+                summary = summaries[version]
+                if summary is None:
+                    lines.append(f"{version}: Error reading metadata{marker}")
+                    continue
+                get = summary.get
+                created_at, row_count = get('created_at', 'N/A'), get('row_count', 'N/A')
+                lines.append(f"{version}: {created_at} ({row_count} rows){marker}")
         
-        print("-" * 60)
+        lines.append("-" * 60)
+        
+        # Emit the whole listing with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return 0
     
@@ -164,23 +180,35 @@ def cmd_info(args, version_manager, logger):
     """Handle info command."""
     try:
         metadata = version_manager.get_version_metadata(args.version)
+        if metadata is None:
+            print(f"ERROR: Metadata not available for {args.version}")
+            return 1
         
-        print(f"\nVersion Information: {args.version}")
-        print("-" * 60)
-        print(f"Created: {metadata.get('created_at')}")
-        print(f"Source: {metadata.get('source_file')}")
-        print(f"Rows: {metadata.get('row_count')}")
-        print(f"Columns: {metadata.get('column_count')}")
+        get = metadata.get
+        columns = get('columns')
+        quality_score = get('quality_score')
+        
+        lines = [
+            f"\nVersion Information: {args.version}",
+            "-" * 60,
+            f"Created: {get('created_at')}",
+            f"Source: {get('source_file')}",
+            f"Rows: {get('row_count')}",
+            f"Columns: {get('column_count')}",
+        ]
+        
+        if columns:
+            lines.append(f"Column List: {', '.join(columns[:5])}{'...' if len(columns) > 5 else ''}")
         
-        if metadata.get('columns'):
-            print(f"Column List: {', '.join(metadata['columns'][:5])}{'...' if len(metadata['columns']) > 5 else ''}")
+        if quality_score:
+            lines.append(f"Quality Score: {quality_score}")
         
-        if metadata.get('quality_score'):
-            print(f"Quality Score: {metadata.get('quality_score')}")
+        lines.append(f"File Hash: {get('file_hash', 'N/A')[:16]}...")
+        lines.append(f"File Size: {get('file_size_bytes', 0) / 1024:.2f} KB")
+        lines.append("-" * 60)
         
-        print(f"File Hash: {metadata.get('file_hash', 'N/A')[:16]}...")
-        print(f"File Size: {metadata.get('file_size_bytes', 0) / 1024:.2f} KB")
-        print("-" * 60)
+        # Emit the whole block with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return 0
     
@@ -189,8 +217,87 @@ def cmd_info(args, version_manager, logger):
         return 1
 
 
-def main():
-    """Main entry point."""
+# Command name -> handler function
+DISPATCH = {
+    'create': cmd_create,
+    'compare': cmd_compare,
+    'rollback': cmd_rollback,
+    'list': cmd_list,
+    'info': cmd_info,
+}
+
+
+def _add_create_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the create command."""
+    parser.add_argument('--input', '-i', required=True, help='Input dataset file')
+    parser.add_argument('--quality-score', '-q', type=float, help='Quality score (0-100)')
+
+
+def _add_compare_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the compare command."""
+    parser.add_argument('--from', dest='from_version', required=True, help='Source version')
+    parser.add_argument('--to', dest='to_version', required=True, help='Target version')
+    parser.add_argument('--output', '-o', default='data/version_comparison.json', help='Output file')
+
+
+def _add_rollback_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the rollback command."""
+    parser.add_argument('--to', dest='to_version', required=True, help='Target version')
+    parser.add_argument('--force', '-f', action='store_true', help='Skip confirmation')
+
+
+def _add_list_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the list command."""
+
+
+def _add_info_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the info command."""
+    parser.add_argument('--version', '-v', required=True, help='Version name')
+
+
+# Command name -> (help text, function adding the command's arguments)
+SUBCOMMANDS = {
+    'create': ('Create a new version', _add_create_arguments),
+    'compare': ('Compare two versions', _add_compare_arguments),
+    'rollback': ('Rollback to a version', _add_rollback_arguments),
+    'list': ('List all versions', _add_list_arguments),
+    'info': ('Show version information', _add_info_arguments),
+}
+
+
+def _peek_command(argv: List[str]) -> Optional[str]:
+    """
+    Find the command name in the arguments without fully parsing them.
+    
+    Args:
+        argv: Command line arguments
+        
+    Returns:
+        Command name, or None if no command was given
+    """
+    args = iter(argv)
+    for arg in args:
+        if arg in ('--config', '-c'):
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+
+@lru_cache(maxsize=len(SUBCOMMANDS) + 1)
+def _build_parser(selected_command: Optional[str]) -> argparse.ArgumentParser:
+    """
+    Build the argument parser once per process and selected command.
+    
+    Only the selected command gets its arguments; the rest are registered
+    with their help text alone.
+    
+    Args:
+        selected_command: Command whose arguments should be added
+        
+    Returns:
+        Configured argument parser
+    """
     
     # Create main parser
     parser = argparse.ArgumentParser(
@@ -229,31 +336,35 @@ Examples:
     # Subparsers for commands
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
-    # Create command
-    create_parser = subparsers.add_parser('create', help='Create a new version')
-    create_parser.add_argument('--input', '-i', required=True, help='Input dataset file')
-    create_parser.add_argument('--quality-score', '-q', type=float, help='Quality score (0-100)')
+    for name, (help_text, add_arguments) in SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if name == selected_command:
+            add_arguments(subparser)
     
-    # Compare command
-    compare_parser = subparsers.add_parser('compare', help='Compare two versions')
-    compare_parser.add_argument('--from', dest='from_version', required=True, help='Source version')
-    compare_parser.add_argument('--to', dest='to_version', required=True, help='Target version')
-    compare_parser.add_argument('--output', '-o', default='data/version_comparison.json', help='Output file')
-    
-    # Rollback command
-    rollback_parser = subparsers.add_parser('rollback', help='Rollback to a version')
-    rollback_parser.add_argument('--to', dest='to_version', required=True, help='Target version')
-    rollback_parser.add_argument('--force', '-f', action='store_true', help='Skip confirmation')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point.
     
-    # List command
-    list_parser = subparsers.add_parser('list', help='List all versions')
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit code
+    """
+    if argv is None:
+        argv = sys.argv[1:]
     
-    # Info command
-    info_parser = subparsers.add_parser('info', help='Show version information')
-    info_parser.add_argument('--version', '-v', required=True, help='Version name')
+    # Unknown command names all share the parser without command arguments
+    selected_command = _peek_command(argv)
+    if selected_command not in SUBCOMMANDS:
+        selected_command = None
+    parser = _build_parser(selected_command)
     
     # Parse arguments
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if not args.command:
         parser.print_help()
@@ -261,7 +372,7 @@ Examples:
     
     try:
         # Load configuration
-        config = load_config(args.config)
+        config = load_config_cached(args.config)
         
         # Setup logging
         logger = setup_logging(config, "DataVersioning")
@@ -269,23 +380,18 @@ Examples:
         if args.verbose:
             logger.setLevel(logging.DEBUG)
         
+        # Imported here so usage errors and --help skip loading it
+        from version_manager import VersionManager
+        
         # Initialize version manager
-        version_manager = VersionManager(args.config, logger)
+        version_manager = VersionManager(args.config, logger, config=config)
         
         # Execute command
-        if args.command == 'create':
-            return cmd_create(args, version_manager, logger)
-        elif args.command == 'compare':
-            return cmd_compare(args, version_manager, logger)
-        elif args.command == 'rollback':
-            return cmd_rollback(args, version_manager, logger)
-        elif args.command == 'list':
-            return cmd_list(args, version_manager, logger)
-        elif args.command == 'info':
-            return cmd_info(args, version_manager, logger)
-        else:
+        handler = DISPATCH.get(args.command)
+        if handler is None:
             print(f"Unknown command: {args.command}")
             return 1
+        return handler(args, version_manager, logger)
     
     except Exception as e:
         print(f"ERROR: {str(e)}")
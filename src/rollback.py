@@ -6,10 +6,19 @@ Handles safe rollback to previous versions.
 import os
 import shutil
 import logging
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-from utils import get_timestamp, load_json, save_json, write_text_file
-from version_manager import VersionManager
+from utils import (
+    get_timestamp, load_json, write_text_file,
+    append_json_line, iter_json_lines
+)
+from version_manager import VersionManager, BACKUPS_FILE
+
+# Append-only rollback audit trail, one JSON event per line
+ROLLBACK_HISTORY_FILE = "rollback_history.jsonl"
+
+# Earlier releases rewrote a single JSON document; it is still read for history
+LEGACY_ROLLBACK_HISTORY_FILE = "rollback_history.json"
 
 
 class RollbackManager:
@@ -28,14 +37,48 @@ class RollbackManager:
         self.version_manager = version_manager
         self.logger = logger or logging.getLogger("RollbackManager")
         self.config = version_manager.config
+        
+        # Settings and paths used on every rollback, resolved once
+        self._backup_before_rollback = bool(self.config['version_management']['backup_before_rollback'])
+        self._logs_dir = self.config['storage']['logs_dir']
+        self._rollback_log_file = os.path.join(self._logs_dir, ROLLBACK_HISTORY_FILE)
+        self._legacy_rollback_log_file = os.path.join(self._logs_dir, LEGACY_ROLLBACK_HISTORY_FILE)
+        self._versions_dir = str(version_manager.versions_dir)
+        
+        # Version name -> metadata.json path, filled in as versions are checked
+        self._metadata_files: Dict[str, str] = {}
+    
+    def _get_metadata_file(self, version_name: str) -> str:
+        """
+        Get the path of a version's metadata file.
+        
+        Args:
+            version_name: Name of the version
+            
+        Returns:
+            Path to the version's metadata.json
+        """
+        metadata_file = self._metadata_files.get(version_name)
+        if metadata_file is None:
+            metadata_file = f"{self._versions_dir}/{version_name}/metadata.json"
+            self._metadata_files[version_name] = metadata_file
+        return metadata_file
     
-    def rollback_to_version(self, target_version: str, create_backup: bool = True) -> bool:
+    def rollback_to_version(
+        self,
+        target_version: str,
+        create_backup: bool = True,
+        all_versions: Optional[List[str]] = None,
+        current_version: Optional[str] = None
+    ) -> bool:
         """
         Rollback to a previous version.
         
         Args:
             target_version: Name of the version to rollback to
             create_backup: Whether to create a backup before rollback
+            all_versions: Known list of versions (read from disk if not given)
+            current_version: Known current version (read from disk if not given)
             
         Returns:
             True if rollback successful, False otherwise
@@ -45,22 +88,46 @@ class RollbackManager:
             ValueError: If trying to rollback to current version
         """
         # Validate target version exists
-        all_versions = self.version_manager.get_all_versions()
+        if all_versions is None:
+            all_versions = self.version_manager.get_all_versions()
         if target_version not in all_versions:
             self.logger.error(f"Target version '{target_version}' does not exist")
             raise FileNotFoundError(f"Target version '{target_version}' does not exist")
         
         # Get current version
-        current_version = self.version_manager.get_current_version()
+        if current_version is None:
+            current_version = self.version_manager.get_current_version()
         
         if current_version == target_version:
             self.logger.warning(f"Already at version {target_version}")
             raise ValueError(f"Already at version {target_version}")
         
+        return self._rollback_to_version_unchecked(target_version, current_version, create_backup)
+    
+    def _rollback_to_version_unchecked(
+        self,
+        target_version: str,
+        current_version: Optional[str],
+        create_backup: bool = True
+    ) -> bool:
+        """
+        Rollback to a version that has already been validated.
+        
+        Callers must have checked the target with is_safe_to_rollback or
+        rollback_to_version; no existence checks are repeated here.
+        
+        Args:
+            target_version: Name of the version to rollback to
+            current_version: Name of the version being rolled back from
+            create_backup: Whether to create a backup before rollback
+            
+        Returns:
+            True if rollback successful
+        """
         self.logger.info(f"Starting rollback from {current_version} to {target_version}")
         
         # Create backup if requested
-        if create_backup and self.config['version_management']['backup_before_rollback']:
+        if create_backup and self._backup_before_rollback:
             self._create_rollback_backup(current_version)
         
         # Set target version as current
@@ -87,19 +154,10 @@ class RollbackManager:
                 "reason": "Pre-rollback backup"
             }
             
-            # Store backup info in version metadata
-            metadata_file = os.path.join(
-                self.version_manager.versions_dir,
-                version_name,
-                "metadata.json"
-            )
-            
-            if os.path.exists(metadata_file):
-                metadata = load_json(metadata_file)
-                if "backups" not in metadata:
-                    metadata["backups"] = []
-                metadata["backups"].append(backup_info)
-                save_json(metadata, metadata_file)
+            # Record the backup in an append-only sidecar next to the version
+            # metadata instead of rewriting metadata.json
+            if os.path.exists(self._get_metadata_file(version_name)):
+                append_json_line(backup_info, f"{self._versions_dir}/{version_name}/{BACKUPS_FILE}")
             
             self.logger.info(f"Created backup for {version_name}")
         
@@ -110,61 +168,62 @@ class RollbackManager:
         """
         Log rollback event for audit trail.
         
+        Events are appended to a JSON Lines file, so earlier entries are
+        never re-read or rewritten.
+        
         Args:
             from_version: Version rolled back from
             to_version: Version rolled back to
         """
         try:
-            rollback_log_file = os.path.join(
-                self.version_manager.config['storage']['logs_dir'],
-                "rollback_history.json"
-            )
-            
-            # Load existing rollback history or create new
-            if os.path.exists(rollback_log_file):
-                rollback_history = load_json(rollback_log_file)
-            else:
-                rollback_history = {"rollbacks": []}
-            
-            # Add new rollback event
             rollback_event = {
                 "timestamp": get_timestamp(),
                 "from_version": from_version,
                 "to_version": to_version
             }
             
-            rollback_history["rollbacks"].append(rollback_event)
-            
-            # Save updated history
-            save_json(rollback_history, rollback_log_file)
+            append_json_line(rollback_event, self._rollback_log_file)
             
             self.logger.info(f"Logged rollback event: {from_version} -> {to_version}")
         
         except Exception as e:
             self.logger.warning(f"Failed to log rollback event: {str(e)}")
     
-    def get_rollback_history(self) -> list:
+    def iter_rollback_history(self) -> Iterator[Dict[str, Any]]:
         """
-        Get the rollback history.
+        Iterate over the rollback history without loading it all at once.
         
-        Returns:
-            List of rollback events
+        Events from the legacy rollback_history.json come first, followed
+        by those in rollback_history.jsonl, which is read line by line.
+        
+        Yields:
+            Rollback event dictionaries, oldest first
         """
         try:
-            rollback_log_file = os.path.join(
-                self.version_manager.config['storage']['logs_dir'],
-                "rollback_history.json"
-            )
-            
-            if os.path.exists(rollback_log_file):
-                history = load_json(rollback_log_file)
-                return history.get("rollbacks", [])
+            try:
+                legacy_history = load_json(self._legacy_rollback_log_file)
+                yield from legacy_history.get("rollbacks", [])
+            except FileNotFoundError:
+                pass
             
-            return []
+            try:
+                yield from iter_json_lines(self._rollback_log_file)
+            except FileNotFoundError:
+                pass
         
         except Exception as e:
             self.logger.error(f"Failed to read rollback history: {str(e)}")
-            return []
+    
+    def get_rollback_history(self) -> list:
+        """
+        Get the rollback history.
+        
+        Prefer iter_rollback_history when the events are only iterated once.
+        
+        Returns:
+            List of rollback events
+        """
+        return list(self.iter_rollback_history())
     
     def get_version_history(self) -> list:
         """
@@ -174,41 +233,43 @@ class RollbackManager:
             List of versions from the index
         """
         try:
-            if os.path.exists(self.version_manager.index_file):
-                index = load_json(self.version_manager.index_file)
-                return index.get("versions", [])
-            
-            return []
+            return list(self.version_manager.iter_index_entries())
         
         except Exception as e:
             self.logger.error(f"Failed to read version history: {str(e)}")
             return []
     
-    def is_safe_to_rollback(self, target_version: str) -> tuple:
+    def is_safe_to_rollback(
+        self,
+        target_version: str,
+        all_versions: Optional[List[str]] = None,
+        current_version: Optional[str] = None
+    ) -> tuple:
         """
         Check if it's safe to rollback to a version.
         
         Args:
             target_version: Name of the version to check
+            all_versions: Known list of versions (read from disk if not given)
+            current_version: Known current version (read from disk if not given)
             
         Returns:
             Tuple of (is_safe, reason)
         """
-        all_versions = self.version_manager.get_all_versions()
+        if all_versions is None:
+            all_versions = self.version_manager.get_all_versions()
         
         if target_version not in all_versions:
             return False, f"Version '{target_version}' does not exist"
         
-        current_version = self.version_manager.get_current_version()
+        if current_version is None:
+            current_version = self.version_manager.get_current_version()
         
         if current_version == target_version:
             return False, f"Already at version {target_version}"
         
         # Check if version directory exists and has metadata
-        version_path = os.path.join(self.version_manager.versions_dir, target_version)
-        metadata_file = os.path.join(version_path, "metadata.json")
-        
-        if not os.path.exists(metadata_file):
+        if not os.path.exists(self._get_metadata_file(target_version)):
             return False, f"Metadata file not found for {target_version}"
         
         return True, "Safe to rollback"
@@ -10,19 +10,58 @@ import os
 import sys
 import argparse
 import logging
+from functools import lru_cache
+from typing import List, Optional, Union
 
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils import setup_logging, load_config
-from version_manager import VersionManager
-from rollback import RollbackManager
+from utils import setup_logging, load_config_cached
 
+# Answers accepted as confirmation (compared after strip().lower())
+CONFIRM_RESPONSES = frozenset({'yes', 'y'})
 
-def main():
-    """Main entry point for rollback_version CLI."""
+# Section separator, pre-encoded so it skips the text layer's encoder
+_BANNER = b"=" * 60 + b"\n"
+
+
+def _write_block(*parts: Union[bytes, str]) -> None:
+    """
+    Write a block of output to stdout with a single write and flush.
     
-    # Parse command line arguments
+    Text parts are encoded with stdout's encoding; bytes parts (such as
+    _BANNER) are written as-is.
+    
+    Args:
+        *parts: Pieces of output, in order
+    """
+    stream = sys.stdout
+    buffer = getattr(stream, 'buffer', None)
+    
+    # Streams without a binary buffer (e.g. redirected to StringIO) get text
+    if buffer is None:
+        stream.write(''.join(p if isinstance(p, str) else p.decode() for p in parts))
+        stream.flush()
+        return
+    
+    encoding = stream.encoding or 'utf-8'
+    errors = stream.errors or 'strict'
+    data = b''.join(p if isinstance(p, bytes) else p.encode(encoding, errors) for p in parts)
+    
+    # Anything already printed through the text layer has to go out first
+    stream.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser once per process.
+    
+    Returns:
+        Configured argument parser
+    """
     parser = argparse.ArgumentParser(
         description="Rollback to a previous dataset version",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -70,11 +109,27 @@ Examples:
         help='Enable verbose logging'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for rollback_version CLI.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit code
+    """
+    
+    # Parse command line arguments
+    parser = _build_parser()
+    args = parser.parse_args(argv)
     
     try:
         # Load configuration
-        config = load_config(args.config)
+        config = load_config_cached(args.config)
         
         # Setup logging
         logger = setup_logging(config, "RollbackVersion")
@@ -86,50 +141,55 @@ Examples:
         logger.info("Data Versioning System - Rollback")
         logger.info("=" * 60)
         
-        # Initialize managers
-        version_manager = VersionManager(args.config, logger)
-        rollback_manager = RollbackManager(version_manager, logger)
+        # Imported here so usage errors and --help skip loading it
+        from version_manager import VersionManager
+        
+        # Initialize version manager
+        version_manager = VersionManager(args.config, logger, config=config)
         
         # Handle --list flag
         if args.list:
-            all_versions = version_manager.get_all_versions()
-            current_version = version_manager.get_current_version()
+            all_versions, current_version = version_manager.get_state()
             
-            print("\n" + "=" * 60)
-            print("Available Versions")
-            print("=" * 60)
+            lines = []
             
             if not all_versions:
-                print("No versions found")
+                lines.append("No versions found")
             else:
+                summaries = version_manager.get_version_summaries(all_versions)
+                
                 for version in all_versions:
                     marker = " ← CURRENT" if version == current_version else ""
-                    try:
-                        metadata = version_manager.get_version_metadata(version)
-                        created_at = metadata.get('created_at', 'N/A')
-                        row_count = metadata.get('row_count', 'N/A')
-                        print(f"  {version}: {created_at} ({row_count} rows){marker}")
-                    except Exception as e:
-                        print(f"  {version}: Error reading metadata{marker}")
+                    summary = summaries[version]
+                    if summary is None:
+                        lines.append(f"  {version}: Error reading metadata{marker}")
+                        continue
+                    get = summary.get
+                    created_at, row_count = get('created_at', 'N/A'), get('row_count', 'N/A')
+                    lines.append(f"  {version}: {created_at} ({row_count} rows){marker}")
             
-            print("=" * 60)
+            # Emit the whole listing with a single write
+            _write_block(b"\n", _BANNER, "Available Versions\n", _BANNER, "\n".join(lines) + "\n", _BANNER)
             return 0
         
+        # Only history and rollback need the rollback manager
+        from rollback import RollbackManager
+        rollback_manager = RollbackManager(version_manager, logger)
+        
         # Handle --history flag
         if args.history:
-            rollback_history = rollback_manager.get_rollback_history()
+            _write_block(b"\n", _BANNER, "Rollback History\n", _BANNER)
             
-            print("\n" + "=" * 60)
-            print("Rollback History")
-            print("=" * 60)
+            # Stream events so memory use doesn't grow with history length
+            has_history = False
+            for event in rollback_manager.iter_rollback_history():
+                has_history = True
+                print(f"  {event['timestamp']}: {event['from_version']} → {event['to_version']}")
             
-            if not rollback_history:
+            if not has_history:
                 print("No rollback history found")
-            else:
-                for event in rollback_history:
-                    print(f"  {event['timestamp']}: {event['from_version']} → {event['to_version']}")
             
-            print("=" * 60)
+            _write_block(_BANNER)
             return 0
         
         # Handle rollback operation
@@ -138,45 +198,46 @@ Examples:
             return 1
         
         # Check if safe to rollback
-        is_safe, reason = rollback_manager.is_safe_to_rollback(args.to)
+        all_versions, current_version = version_manager.get_state()
+        
+        is_safe, reason = rollback_manager.is_safe_to_rollback(
+            args.to, all_versions=all_versions, current_version=current_version
+        )
         
         if not is_safe:
             logger.error(f"Cannot rollback: {reason}")
             print(f"ERROR: {reason}")
             return 1
         
-        # Get current version
-        current_version = version_manager.get_current_version()
-        
-        print("\n" + "=" * 60)
-        print("Rollback Confirmation")
-        print("=" * 60)
-        print(f"Current Version: {current_version}")
-        print(f"Target Version: {args.to}")
-        
-        if not args.no_backup:
-            print("Backup: Will be created before rollback")
-        else:
-            print("Backup: Skipped")
+        backup_line = "Backup: Will be created before rollback" if not args.no_backup else "Backup: Skipped"
+        _write_block(
+            b"\n", _BANNER, "Rollback Confirmation\n", _BANNER,
+            f"Current Version: {current_version}\n"
+            f"Target Version: {args.to}\n"
+            f"{backup_line}\n"
+        )
         
         # Ask for confirmation
         response = input("\nProceed with rollback? (yes/no): ").strip().lower()
         
-        if response not in ['yes', 'y']:
+        if response not in CONFIRM_RESPONSES:
             print("Rollback cancelled")
             logger.info("Rollback cancelled by user")
             return 0
         
         # Perform rollback
         create_backup = not args.no_backup
-        rollback_manager.rollback_to_version(args.to, create_backup=create_backup)
-        
-        print("\n" + "=" * 60)
-        print("✓ Rollback completed successfully!")
-        print("=" * 60)
-        print(f"Previous Version: {current_version}")
-        print(f"Current Version: {args.to}")
-        print("=" * 60)
+        # Already validated by is_safe_to_rollback above
+        rollback_manager._rollback_to_version_unchecked(
+            args.to, current_version, create_backup=create_backup
+        )
+        
+        _write_block(
+            b"\n", _BANNER, "✓ Rollback completed successfully!\n", _BANNER,
+            f"Previous Version: {current_version}\n"
+            f"Current Version: {args.to}\n",
+            _BANNER
+        )
         
         logger.info(f"Rollback completed: {current_version} → {args.to}")
         
@@ -3,15 +3,44 @@ Utility functions for the data versioning system.
 Includes configuration loading, logging setup, and common helpers.
 """
 
+import io
 import os
+import queue
+import atexit
 import json
-import yaml
 import logging
+import shutil
 import hashlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
-from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, BinaryIO, Iterator, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Config path -> ((st_mtime_ns, st_size), parsed config), see load_config_cached
+_CONFIG_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+# Bytes read per hash update when hashing files
+HASH_CHUNK_SIZE = 1 << 20
+
+# Linux ioctl that makes dst a copy-on-write clone of src
+FICLONE = 0x40049409
+
+# Bytes requested per os.copy_file_range call
+COPY_RANGE_CHUNK_SIZE = 1 << 30
 
 
 def load_config(config_path: str = "config/versioning_config.yaml") -> Dict[str, Any]:
@@ -28,21 +57,69 @@ def load_config(config_path: str = "config/versioning_config.yaml") -> Dict[str,
         FileNotFoundError: If config file doesn't exist
         yaml.YAMLError: If YAML parsing fails
     """
-    if not os.path.exists(config_path):
+    try:
+        with open(config_path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     
+    # Imported here so code paths that never parse YAML don't load PyYAML;
+    # the libyaml-backed loader is used when PyYAML was built with it
+    import yaml
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        return config
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+    
+    try:
+        config = yaml.load(raw, Loader=YamlLoader)
     except yaml.YAMLError as e:
         raise yaml.YAMLError(f"Error parsing YAML configuration: {str(e)}")
+    
+    return config
+
+
+def load_config_cached(config_path: str = "config/versioning_config.yaml") -> Dict[str, Any]:
+    """
+    Load configuration from YAML file, reusing the parsed result in-process.
+    
+    The cache is keyed on the file's modification time and size, so edits
+    to the file are picked up. The returned dictionary is shared between
+    callers and must not be mutated.
+    
+    Args:
+        config_path: Path to the configuration file
+        
+    Returns:
+        Dictionary containing configuration
+        
+    Raises:
+        FileNotFoundError: If config file doesn't exist
+        yaml.YAMLError: If YAML parsing fails
+    """
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+    
+    config = load_config(config_path)
+    _CONFIG_CACHE[config_path] = (cache_key, config)
+    
+    return config
 
 
 def setup_logging(config: Dict[str, Any], logger_name: str = "DataVersioning") -> logging.Logger:
     """
     Setup logging configuration based on config file.
     
+    Records are written to the log file and console by a background
+    QueueListener, so logging calls don't block on formatting or I/O.
+    
     Args:
         config: Configuration dictionary
         logger_name: Name of the logger
@@ -51,6 +128,12 @@ def setup_logging(config: Dict[str, Any], logger_name: str = "DataVersioning") -
         Configured logger instance
     """
     logger = logging.getLogger(logger_name)
+    
+    # Already configured by an earlier call; adding handlers again would
+    # duplicate every log line
+    if logger.handlers:
+        return logger
+    
     logger.setLevel(getattr(logging, config['logging']['level']))
     
     # Create logs directory if it doesn't exist
@@ -58,11 +141,13 @@ def setup_logging(config: Dict[str, Any], logger_name: str = "DataVersioning") -
     os.makedirs(logs_dir, exist_ok=True)
     
     # File handler with rotation
+    from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
     log_file = os.path.join(logs_dir, config['logging']['file'])
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=config['logging']['max_file_size'] * 1024 * 1024,
-        backupCount=config['logging']['backup_count']
+        backupCount=config['logging']['backup_count'],
+        delay=True
     )
     file_handler.setLevel(getattr(logging, config['logging']['level']))
     
@@ -75,39 +160,200 @@ def setup_logging(config: Dict[str, Any], logger_name: str = "DataVersioning") -
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
+    # Handlers run on a listener thread; logging calls only enqueue records.
+    # Stopping the listener at exit writes out whatever is still queued.
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
     # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    logger.addHandler(QueueHandler(log_queue))
     
     return logger
 
 
-def get_file_hash(file_path: str, algorithm: str = 'sha256') -> str:
+def resolve_hash_algorithm(algorithm: str) -> str:
+    """
+    Resolve a configured hash algorithm to one that can be used here.
+    
+    BLAKE3 needs the optional 'blake3' package; without it, sha256 is used.
+    
+    Args:
+        algorithm: Configured algorithm name
+        
+    Returns:
+        Algorithm name to pass to get_file_hash
+    """
+    if algorithm == 'blake3' and blake3 is None:
+        return 'sha256'
+    return algorithm
+
+
+def new_hash(algorithm: str = 'sha256') -> Any:
+    """
+    Create a hash object for an algorithm name.
+    
+    Args:
+        algorithm: Hash algorithm to use; 'blake3' requires the blake3
+            package, any other name goes to hashlib
+        
+    Returns:
+        Hash object with update() and hexdigest()
+        
+    Raises:
+        ValueError: If blake3 is requested but not installed
+    """
+    if algorithm == 'blake3':
+        if blake3 is None:
+            raise ValueError("BLAKE3 hashing requires the 'blake3' package")
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.new(algorithm)
+
+
+def get_file_hash(file_path: str, algorithm: str = 'sha256', chunk_size: int = HASH_CHUNK_SIZE) -> str:
     """
     Calculate hash of a file for integrity checking.
     
     Args:
         file_path: Path to the file
-        algorithm: Hash algorithm to use (default: sha256)
+        algorithm: Hash algorithm to use (default: sha256); 'blake3'
+            requires the blake3 package, any other name goes to hashlib
+        chunk_size: Number of bytes read per hash update (default: 1 MiB)
         
     Returns:
         Hex digest of the file hash
         
     Raises:
         FileNotFoundError: If file doesn't exist
+        ValueError: If blake3 is requested but not installed
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+    hash_obj = new_hash(algorithm)
     
-    hash_obj = hashlib.new(algorithm)
+    try:
+        # Unbuffered: reads are already large, so skip the extra buffer copy
+        f = open(file_path, 'rb', buffering=0)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}")
     
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
+    with f:
+        # BLAKE3 can hash a memory-mapped file with its own threads
+        if algorithm == 'blake3' and hasattr(hash_obj, 'update_mmap'):
+            hash_obj.update_mmap(file_path)
+            return hash_obj.hexdigest()
+        
+        while chunk := f.read(chunk_size):
             hash_obj.update(chunk)
     
     return hash_obj.hexdigest()
 
 
+def _clone_fd(src_fd: int, dst_fd: int) -> bool:
+    """Make dst a copy-on-write clone of src; False if unsupported."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def clone_file(src: str, dst: str) -> bool:
+    """
+    Create dst as a copy-on-write clone of src (btrfs/XFS and similar).
+    
+    Args:
+        src: Source file path
+        dst: Destination file path
+        
+    Returns:
+        True if the clone was made; False if the filesystem or platform
+        doesn't support it, in which case dst is not left behind
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if _clone_fd(fsrc.fileno(), fdst.fileno()):
+            return True
+    os.remove(dst)
+    return False
+
+
+class TeeReader(io.RawIOBase):
+    """
+    Raw binary reader that feeds everything it reads to a hash and a copy.
+    
+    Wrapping it in io.BufferedReader / io.TextIOWrapper lets a parser
+    consume a file while the same read also hashes and copies the bytes.
+    """
+    
+    def __init__(self, source: BinaryIO, hash_obj: Optional[Any] = None, sink: Optional[BinaryIO] = None):
+        """
+        Initialize the TeeReader.
+        
+        Args:
+            source: Binary file to read from
+            hash_obj: Hash object updated with every chunk read (optional)
+            sink: Binary file every chunk read is written to (optional)
+        """
+        self.source = source
+        self.hash_obj = hash_obj
+        self.sink = sink
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        n = self.source.readinto(buffer)
+        if n:
+            chunk = memoryview(buffer)[:n]
+            if self.hash_obj is not None:
+                self.hash_obj.update(chunk)
+            if self.sink is not None:
+                self.sink.write(chunk)
+        return n
+    
+    def drain(self, chunk_size: int = HASH_CHUNK_SIZE) -> None:
+        """Read the rest of the source so the hash and copy are complete."""
+        buffer = bytearray(chunk_size)
+        while self.readinto(buffer):
+            pass
+
+
+def fast_copy(src: str, dst: str) -> None:
+    """
+    Copy a file's contents using the cheapest mechanism available.
+    
+    Tries a copy-on-write clone (FICLONE, on btrfs/XFS and similar), then
+    an in-kernel os.copy_file_range, then a buffered userspace copy. File
+    metadata is not copied; use shutil.copystat for that.
+    
+    Args:
+        src: Source file path
+        dst: Destination file path
+        
+    Raises:
+        FileNotFoundError: If the source file doesn't exist
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        
+        if _clone_fd(src_fd, dst_fd):
+            return
+        
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while os.copy_file_range(src_fd, dst_fd, COPY_RANGE_CHUNK_SIZE) > 0:
+                    pass
+                return
+            except OSError:
+                # Start over with a plain copy if the kernel refused part way
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        
+        shutil.copyfileobj(fsrc, fdst, HASH_CHUNK_SIZE)
+
+
 def get_file_size(file_path: str) -> int:
     """
     Get file size in bytes.
@@ -121,10 +367,11 @@ def get_file_size(file_path: str) -> int:
     Raises:
         FileNotFoundError: If file doesn't exist
     """
-    if not os.path.exists(file_path):
+    # One stat call; a missing file surfaces as the FileNotFoundError
+    try:
+        return os.stat(file_path).st_size
+    except FileNotFoundError:
         raise FileNotFoundError(f"File not found: {file_path}")
-    
-    return os.path.getsize(file_path)
 
 
 def get_timestamp() -> str:
@@ -151,6 +398,8 @@ def load_json(file_path: str) -> Dict[str, Any]:
     """
     Load JSON file.
     
+    Uses orjson when it is installed, stdlib json otherwise.
+    
     Args:
         file_path: Path to the JSON file
         
@@ -161,12 +410,16 @@ def load_json(file_path: str) -> Dict[str, Any]:
         FileNotFoundError: If file doesn't exist
         json.JSONDecodeError: If JSON parsing fails
     """
-    if not os.path.exists(file_path):
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
         raise FileNotFoundError(f"JSON file not found: {file_path}")
     
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
     except json.JSONDecodeError as e:
         raise json.JSONDecodeError(f"Error parsing JSON: {str(e)}", e.doc, e.pos)
 
@@ -175,6 +428,8 @@ def save_json(data: Dict[str, Any], file_path: str, pretty: bool = True) -> None
     """
     Save data to JSON file.
     
+    Uses orjson when it is installed, stdlib json otherwise.
+    
     Args:
         data: Dictionary to save
         file_path: Path to save the JSON file
@@ -182,11 +437,60 @@ def save_json(data: Dict[str, Any], file_path: str, pretty: bool = True) -> None
     """
     ensure_directory(os.path.dirname(file_path))
     
-    with open(file_path, 'w') as f:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
         if pretty:
-            json.dump(data, f, indent=2, default=str)
-        else:
-            json.dump(data, f, default=str)
+            option |= orjson.OPT_INDENT_2
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option, default=str))
+        return
+    
+    # Encode in one go; json.dump would issue a write per token
+    content = json.dumps(data, indent=2 if pretty else None, default=str)
+    with open(file_path, 'w') as f:
+        f.write(content)
+
+
+def append_json_line(data: Dict[str, Any], file_path: str) -> None:
+    """
+    Append a record to a JSON Lines file.
+    
+    Args:
+        data: Dictionary to append
+        file_path: Path to the JSON Lines file
+    """
+    ensure_directory(os.path.dirname(file_path))
+    
+    if orjson is not None:
+        line = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=str)
+    else:
+        line = json.dumps(data, default=str).encode('utf-8')
+    
+    with open(file_path, 'ab') as f:
+        f.write(line + b"\n")
+
+
+def iter_json_lines(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the records of a JSON Lines file.
+    
+    Blank lines are skipped.
+    
+    Args:
+        file_path: Path to the JSON Lines file
+        
+    Yields:
+        Parsed record for each line
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
 
 
 def read_text_file(file_path: str) -> str:
@@ -233,17 +537,19 @@ def get_next_version_number(versions_dir: str) -> int:
     Returns:
         Next version number
     """
-    if not os.path.exists(versions_dir):
-        return 1
-    
     existing_versions = []
-    for item in os.listdir(versions_dir):
-        if item.startswith('v') and os.path.isdir(os.path.join(versions_dir, item)):
-            try:
-                version_num = int(item[1:])
-                existing_versions.append(version_num)
-            except ValueError:
-                continue
+    
+    try:
+        with os.scandir(versions_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('v') and entry.is_dir():
+                    try:
+                        version_num = int(entry.name[1:])
+                        existing_versions.append(version_num)
+                    except ValueError:
+                        continue
+    except FileNotFoundError:
+        return 1
     
     if not existing_versions:
         return 1
@@ -3,56 +3,139 @@ Core versioning logic for the data versioning system.
 Handles version creation, metadata generation, and index management.
 """
 
+import io
 import os
+import re
 import csv
 import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
 from datetime import datetime
 
 from utils import (
-    load_config, get_file_hash, get_file_size, get_timestamp,
+    load_config_cached, get_file_hash, get_file_size, get_timestamp, resolve_hash_algorithm,
     ensure_directory, load_json, save_json, get_next_version_number,
-    validate_version_exists, read_text_file, write_text_file
+    validate_version_exists, read_text_file, write_text_file, iter_json_lines, append_json_line,
+    fast_copy, clone_file, new_hash, TeeReader, HASH_CHUNK_SIZE
 )
 
+# Upper bound on threads used to read metadata files in parallel
+METADATA_READ_WORKERS = 16
+
+# Per-version JSON Lines file recording pre-rollback backups
+BACKUPS_FILE = "backups.jsonl"
+
+# Supported values of storage.copy_mode
+COPY_MODES = frozenset({'copy', 'link'})
+
+# Number of data rows sampled for column type inference
+TYPE_SAMPLE_ROWS = 100
+
+# Characters of CSV text read per block when counting rows
+CSV_COUNT_BLOCK_SIZE = 1 << 20
+
+# Supported values of metadata.csv_engine
+CSV_ENGINES = frozenset({'python', 'pyarrow'})
+
+# Block size for the pyarrow CSV reader; types are inferred from the first block
+CSV_ARROW_BLOCK_SIZE = 16 << 20
+
+# Value classifiers for type inference; they accept the same strings as
+# int() and float() (with a decimal point) without raising on failures
+_DIGITS = r'\d+(?:_\d+)*'
+_INTEGER_RE = re.compile(rf'\s*[+-]?{_DIGITS}\s*')
+_FLOAT_RE = re.compile(
+    rf'\s*[+-]?(?:{_DIGITS}\.(?:{_DIGITS})?|\.{_DIGITS})(?:[eE][+-]?{_DIGITS})?\s*'
+)
+_BOOLEAN_VALUES = frozenset({'true', 'false', 'yes', 'no', '1', '0'})
+
 
 class VersionManager:
     """
     Manages dataset versioning including creation, indexing, and metadata.
     """
     
-    def __init__(self, config_path: str = "config/versioning_config.yaml", logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        config_path: str = "config/versioning_config.yaml",
+        logger: Optional[logging.Logger] = None,
+        config: Optional[Dict[str, Any]] = None
+    ):
         """
         Initialize the VersionManager.
         
         Args:
             config_path: Path to the configuration file
             logger: Logger instance (will be created if not provided)
+            config: Already-loaded configuration (skips re-reading config_path)
         """
-        self.config = load_config(config_path)
+        self.config = config if config is not None else load_config_cached(config_path)
         self.logger = logger or logging.getLogger("VersionManager")
         
         # Set up directory paths
         self.versions_dir = self.config['storage']['versions_dir']
         self.processed_data_dir = self.config['storage']['processed_data_dir']
         self.index_file = self.config['storage']['index_file']
+        self.index_log_file = self.config['storage'].get(
+            'index_log_file', os.path.splitext(self.index_file)[0] + '.jsonl'
+        )
         self.current_version_file = self.config['storage']['current_version_file']
         
+        # Dataset hash algorithm; configs without the key keep sha256
+        requested_algorithm = self.config['metadata'].get('hash_algorithm', 'sha256')
+        self.hash_algorithm = resolve_hash_algorithm(requested_algorithm)
+        if self.hash_algorithm != requested_algorithm:
+            self.logger.debug(f"{requested_algorithm} not available, hashing with {self.hash_algorithm}")
+        
+        # Cached directory listing and current pointer, keyed by file stat
+        self._versions_cache: Optional[Tuple[int, List[str]]] = None
+        self._current_version_cache: Optional[Tuple[Tuple[int, int], str]] = None
+        
+        # How datasets are stored in version directories: 'copy' or 'link'
+        self.copy_mode = self.config['storage'].get('copy_mode', 'copy')
+        if self.copy_mode not in COPY_MODES:
+            self.logger.warning(f"Unknown storage.copy_mode '{self.copy_mode}', using 'copy'")
+            self.copy_mode = 'copy'
+        
+        # CSV analysis engine; 'pyarrow' needs the pyarrow package
+        self.csv_engine = self.config['metadata'].get('csv_engine', 'python')
+        if self.csv_engine not in CSV_ENGINES:
+            self.logger.warning(f"Unknown metadata.csv_engine '{self.csv_engine}', using 'python'")
+            self.csv_engine = 'python'
+        elif self.csv_engine == 'pyarrow':
+            # Imported only when selected; pyarrow is slow to load
+            try:
+                import pyarrow.csv
+            except ImportError:
+                self.logger.debug("pyarrow not available, analyzing CSV files with the csv module")
+                self.csv_engine = 'python'
+        
+        # Next version number to try, scanned from disk on first create
+        self._next_version: Optional[int] = None
+        
         # Ensure directories exist
         ensure_directory(self.versions_dir)
         ensure_directory(self.processed_data_dir)
         
         self.logger.info("VersionManager initialized")
     
-    def create_version(self, input_file: str, quality_score: Optional[float] = None) -> str:
+    def create_version(
+        self,
+        input_file: str,
+        quality_score: Optional[float] = None,
+        input_stat: Optional[os.stat_result] = None
+    ) -> str:
         """
         Create a new version from a processed dataset.
         
         Args:
             input_file: Path to the processed dataset file
             quality_score: Optional data quality score (0-100)
+            input_stat: Result of os.stat on input_file, if the caller already has it
             
         Returns:
             Version name (e.g., 'v1')
@@ -61,35 +144,36 @@ class VersionManager:
             FileNotFoundError: If input file doesn't exist
             ValueError: If quality_score is invalid
         """
-        if not os.path.exists(input_file):
-            self.logger.error(f"Input file not found: {input_file}")
-            raise FileNotFoundError(f"Input file not found: {input_file}")
+        if input_stat is None:
+            try:
+                input_stat = os.stat(input_file)
+            except FileNotFoundError:
+                self.logger.error(f"Input file not found: {input_file}")
+                raise FileNotFoundError(f"Input file not found: {input_file}")
         
         if quality_score is not None and not (0 <= quality_score <= 100):
             self.logger.error(f"Invalid quality score: {quality_score}")
             raise ValueError("Quality score must be between 0 and 100")
         
-        # Get next version number
-        version_number = get_next_version_number(self.versions_dir)
+        # Reserve the next version number by creating its directory
+        version_number, version_path = self._claim_next_version()
         version_name = f"v{version_number}"
-        version_path = os.path.join(self.versions_dir, version_name)
-        
-        # Create version directory
-        ensure_directory(version_path)
+        self._versions_cache = None
         
         # Copy dataset to version directory
         dataset_filename = os.path.basename(input_file)
         versioned_dataset_path = os.path.join(version_path, dataset_filename)
-        shutil.copy2(input_file, versioned_dataset_path)
-        
-        self.logger.info(f"Copied dataset to {versioned_dataset_path}")
+        analysis, file_hash = self._store_dataset(input_file, versioned_dataset_path)
         
         # Generate metadata
         metadata = self._generate_metadata(
             version_name=version_name,
             dataset_path=versioned_dataset_path,
             source_file=input_file,
-            quality_score=quality_score
+            quality_score=quality_score,
+            file_size=input_stat.st_size,
+            analysis=analysis,
+            file_hash=file_hash
         )
         
         # Save metadata
@@ -108,12 +192,155 @@ class VersionManager:
         
         return version_name
     
+    def _store_dataset(
+        self,
+        input_file: str,
+        dataset_path: str
+    ) -> Tuple[Optional[Tuple[int, List[str], Optional[Dict[str, str]]]], Optional[str]]:
+        """
+        Place the input dataset in a version directory and scan it.
+        
+        With the default csv engine the CSV analysis runs on the same read
+        that stores and hashes the file. The pyarrow engine parses the input
+        on a worker thread instead, overlapping that read.
+        
+        Args:
+            input_file: Path to the processed dataset file
+            dataset_path: Destination path inside the version directory
+            
+        Returns:
+            Tuple of (CSV analysis as returned by _analyze_csv_full, file hash);
+            either is None when the metadata config doesn't need it
+        """
+        analyze = self._needs_csv_analysis(dataset_path)
+        
+        if not (analyze and self.csv_engine == 'pyarrow'):
+            return self._copy_and_scan(input_file, dataset_path, analyze)
+        
+        # pyarrow parses in native code and hashing releases the GIL, so both run at once
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            analysis_future = executor.submit(
+                self._analyze_csv_full,
+                input_file,
+                infer_types=self.config['metadata']['include_data_types'],
+                count_rows=self.config['metadata']['include_row_count']
+            )
+            _, file_hash = self._copy_and_scan(input_file, dataset_path, analyze=False)
+            return analysis_future.result(), file_hash
+    
+    def _copy_and_scan(
+        self,
+        input_file: str,
+        dataset_path: str,
+        analyze: bool
+    ) -> Tuple[Optional[Tuple[int, List[str], Optional[Dict[str, str]]]], Optional[str]]:
+        """
+        Store the input dataset in a version directory and scan it in one read.
+        
+        With storage.copy_mode 'link' the version hard-links the input file
+        (falling back to a copy across filesystems); otherwise it is cloned
+        where the filesystem supports it, or copied. The file is read once:
+        that read feeds the hash, the CSV analysis and, when the dataset
+        had to be copied, the copy itself.
+        
+        Args:
+            input_file: Path to the processed dataset file
+            dataset_path: Destination path inside the version directory
+            analyze: Whether to analyze the CSV text with the csv module
+            
+        Returns:
+            Tuple of (CSV analysis as returned by _analyze_csv_stream, file hash);
+            either is None when not requested
+        """
+        want_hash = self.config['metadata']['include_file_hash']
+        stored = None
+        
+        if self.copy_mode == 'link':
+            try:
+                os.link(input_file, dataset_path)
+                stored = "Linked"
+            except OSError as e:
+                self.logger.debug(f"Hard link failed ({str(e)}), copying instead")
+        
+        # Nothing to compute, so let the kernel do the whole copy
+        if stored is None and not (analyze or want_hash):
+            fast_copy(input_file, dataset_path)
+            shutil.copystat(input_file, dataset_path)
+            self.logger.info(f"Copied dataset to {dataset_path}")
+            return None, None
+        
+        if stored is None and clone_file(input_file, dataset_path):
+            stored = "Cloned"
+        
+        # Linked and cloned datasets are scanned from the version's own copy
+        source_path = dataset_path if stored else input_file
+        hash_obj = new_hash(self.hash_algorithm) if want_hash else None
+        analysis = None
+        
+        with open(source_path, 'rb') as source, \
+                (open(dataset_path, 'wb') if stored is None else nullcontext()) as sink:
+            tee = TeeReader(source, hash_obj, sink)
+            
+            if analyze:
+                text = io.TextIOWrapper(io.BufferedReader(tee, HASH_CHUNK_SIZE), encoding='utf-8')
+                analysis = self._analyze_csv_stream(
+                    text,
+                    infer_types=self.config['metadata']['include_data_types'],
+                    count_rows=self.config['metadata']['include_row_count']
+                )
+            
+            # Whatever the analysis didn't consume still has to be hashed/copied
+            tee.drain()
+        
+        if stored is None:
+            shutil.copystat(input_file, dataset_path)
+            stored = "Copied"
+        
+        self.logger.info(f"{stored} dataset to {dataset_path}")
+        
+        return analysis, (hash_obj.hexdigest() if hash_obj is not None else None)
+    
+    def _claim_next_version(self) -> Tuple[int, str]:
+        """
+        Reserve the next version number by creating its directory.
+        
+        The number comes from an in-memory counter, so the versions
+        directory is only scanned on the first create. If the directory
+        already exists (another process created that version), the counter
+        is re-synced from disk.
+        
+        Returns:
+            Tuple of (version number, version directory path)
+        """
+        while True:
+            if self._next_version is None:
+                self._next_version = get_next_version_number(self.versions_dir)
+            
+            version_number = self._next_version
+            version_path = os.path.join(self.versions_dir, f"v{version_number}")
+            
+            try:
+                os.mkdir(version_path)
+            except FileExistsError:
+                self._next_version = None
+                continue
+            except FileNotFoundError:
+                ensure_directory(self.versions_dir)
+                self._next_version = None
+                continue
+            
+            self._next_version = version_number + 1
+            return version_number, version_path
+    
     def _generate_metadata(
         self,
         version_name: str,
         dataset_path: str,
         source_file: str,
-        quality_score: Optional[float] = None
+        quality_score: Optional[float] = None,
+        file_size: Optional[int] = None,
+        analysis: Optional[Tuple[int, List[str], Optional[Dict[str, str]]]] = None,
+        file_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate metadata for a dataset version.
@@ -123,6 +350,9 @@ class VersionManager:
             dataset_path: Path to the dataset file
             source_file: Original source file path
             quality_score: Optional quality score
+            file_size: Dataset size in bytes, if already known
+            analysis: CSV analysis from _analyze_csv_full, if already done
+            file_hash: Dataset hash, if already computed
             
         Returns:
             Dictionary containing metadata
@@ -133,27 +363,36 @@ class VersionManager:
             "source_file": source_file,
         }
         
-        # Add row and column information
-        if dataset_path.endswith('.csv'):
-            row_count, columns = self._analyze_csv(dataset_path)
+        # Add row and column information (the file is only read if one is wanted)
+        if self._needs_csv_analysis(dataset_path):
+            include_data_types = self.config['metadata']['include_data_types']
+            include_row_count = self.config['metadata']['include_row_count']
+            if analysis is None:
+                analysis = self._analyze_csv_full(
+                    dataset_path, infer_types=include_data_types, count_rows=include_row_count
+                )
+            row_count, columns, data_types = analysis
             
-            if self.config['metadata']['include_row_count']:
+            if include_row_count:
                 metadata["row_count"] = row_count
             
             if self.config['metadata']['include_columns']:
                 metadata["columns"] = columns
                 metadata["column_count"] = len(columns)
             
-            if self.config['metadata']['include_data_types']:
-                metadata["data_types"] = self._infer_data_types(dataset_path, columns)
+            if include_data_types:
+                metadata["data_types"] = data_types
         
         # Add file hash
         if self.config['metadata']['include_file_hash']:
-            metadata["file_hash"] = get_file_hash(dataset_path)
+            if file_hash is None:
+                file_hash = get_file_hash(dataset_path, self.hash_algorithm)
+            metadata["file_hash"] = file_hash
+            metadata["hash_algorithm"] = self.hash_algorithm
         
         # Add file size
         if self.config['metadata']['include_file_size']:
-            metadata["file_size_bytes"] = get_file_size(dataset_path)
+            metadata["file_size_bytes"] = file_size if file_size is not None else get_file_size(dataset_path)
         
         # Add quality score
         if quality_score is not None:
@@ -161,119 +400,288 @@ class VersionManager:
         
         return metadata
     
-    def _analyze_csv(self, csv_path: str) -> tuple:
+    def _needs_csv_analysis(self, dataset_path: str) -> bool:
         """
-        Analyze a CSV file to extract row count and column names.
+        Check whether a dataset has to be analyzed for its metadata.
+        
+        Args:
+            dataset_path: Path to the dataset file
+            
+        Returns:
+            True for CSV files when row count, columns or data types are enabled
+        """
+        metadata_config = self.config['metadata']
+        return dataset_path.endswith('.csv') and (
+            metadata_config['include_row_count']
+            or metadata_config['include_columns']
+            or metadata_config['include_data_types']
+        )
+    
+    def _analyze_csv_full(
+        self,
+        csv_path: str,
+        infer_types: bool = True,
+        count_rows: bool = True
+    ) -> Tuple[int, List[str], Optional[Dict[str, str]]]:
+        """
+        Analyze a CSV file in a single streaming pass.
+        
+        With metadata.csv_engine 'pyarrow' the file is parsed by pyarrow; if
+        that fails (e.g. the file isn't valid UTF-8 or has ragged rows) the
+        csv module is used instead.
         
         Args:
             csv_path: Path to the CSV file
+            infer_types: Whether to infer column data types
+            count_rows: Whether to count rows past the sample; if not,
+                row_count only covers the rows read for the sample
             
         Returns:
-            Tuple of (row_count, column_list)
+            Tuple of (row_count, column_list, data_types); data_types is None
+            when infer_types is False
+        """
+        if self.csv_engine == 'pyarrow':
+            try:
+                return self._analyze_csv_arrow(csv_path, infer_types, count_rows)
+            except Exception as e:
+                self.logger.debug(f"pyarrow CSV analysis failed, using csv module: {str(e)}")
+        
+        try:
+            f = open(csv_path, 'r', encoding='utf-8')
+        except OSError as e:
+            self.logger.warning(f"Error analyzing CSV: {str(e)}")
+            return 0, [], ({} if infer_types else None)
+        
+        with f:
+            return self._analyze_csv_stream(f, infer_types, count_rows)
+    
+    def _analyze_csv_arrow(
+        self,
+        csv_path: str,
+        infer_types: bool = True,
+        count_rows: bool = True
+    ) -> Tuple[int, List[str], Optional[Dict[str, str]]]:
+        """
+        Analyze a CSV file with the pyarrow streaming reader.
+        
+        Parsing and type inference run in native code. Types come from
+        pyarrow's own inference over the first block rather than from
+        _infer_data_types, and blank lines are skipped instead of counted.
+        
+        Args:
+            csv_path: Path to the CSV file
+            infer_types: Whether to infer column data types
+            count_rows: Whether to read the whole file to count its rows;
+                if not, row_count is 0
+            
+        Returns:
+            Tuple of (row_count, column_list, data_types); data_types is None
+            when infer_types is False
+            
+        Raises:
+            pyarrow.ArrowInvalid: If pyarrow can't parse the file
+        """
+        import pyarrow.csv as pacsv
+        
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(block_size=CSV_ARROW_BLOCK_SIZE)
+        )
+        
+        try:
+            schema = reader.schema
+            row_count = sum(batch.num_rows for batch in reader) if count_rows else 0
+        finally:
+            reader.close()
+        
+        columns = schema.names
+        data_types = None
+        
+        if infer_types:
+            data_types = {field.name: self._arrow_type_name(field.type) for field in schema}
+        
+        self.logger.debug(f"CSV analysis (pyarrow): {row_count} rows, {len(columns)} columns")
+        
+        return row_count, columns, data_types
+    
+    @staticmethod
+    def _arrow_type_name(arrow_type: Any) -> str:
+        """
+        Map a pyarrow type to the type names used in metadata.
+        
+        Args:
+            arrow_type: pyarrow DataType of a column
+            
+        Returns:
+            'integer', 'float', 'boolean' or 'string'
+        """
+        import pyarrow as pa
+        
+        if pa.types.is_integer(arrow_type):
+            return 'integer'
+        if pa.types.is_floating(arrow_type):
+            return 'float'
+        if pa.types.is_boolean(arrow_type):
+            return 'boolean'
+        return 'string'
+    
+    def _analyze_csv_stream(
+        self,
+        f: TextIO,
+        infer_types: bool = True,
+        count_rows: bool = True
+    ) -> Tuple[int, List[str], Optional[Dict[str, str]]]:
+        """
+        Analyze CSV text read from an open file.
+        
+        The header gives the columns, the first TYPE_SAMPLE_ROWS non-blank
+        rows are kept for type inference, and the rest are only counted.
+        
+        Args:
+            f: Text file positioned at the start of the CSV
+            infer_types: Whether to infer column data types
+            count_rows: Whether to count rows past the sample; if not,
+                row_count only covers the rows read for the sample
+            
+        Returns:
+            Tuple of (row_count, column_list, data_types); data_types is None
+            when infer_types is False
         """
         row_count = 0
         columns = []
+        sample_rows = []
         
         try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                columns = next(reader, [])
-                row_count = sum(1 for _ in reader)
+            reader = csv.reader(f)
+            columns = next(reader, [])
             
-            self.logger.debug(f"CSV analysis: {row_count} rows, {len(columns)} columns")
+            # Blank lines count as rows but aren't sampled; each batch asks for
+            # no more rows than are still missing, so none are over-read
+            if infer_types:
+                while len(sample_rows) < TYPE_SAMPLE_ROWS:
+                    batch = list(islice(reader, TYPE_SAMPLE_ROWS - len(sample_rows)))
+                    if not batch:
+                        break
+                    row_count += len(batch)
+                    sample_rows.extend(filter(None, batch))
         except Exception as e:
             self.logger.warning(f"Error analyzing CSV: {str(e)}")
+            return 0, columns, (self._infer_data_types(columns, []) if infer_types else None)
+        
+        # A read error past the sample loses the row count but not the types
+        if count_rows:
+            try:
+                row_count += self._count_remaining_rows(f)
+            except Exception as e:
+                self.logger.warning(f"Error analyzing CSV: {str(e)}")
+                row_count = 0
         
-        return row_count, columns
+        self.logger.debug(f"CSV analysis: {row_count} rows, {len(columns)} columns")
+        
+        data_types = self._infer_data_types(columns, sample_rows) if infer_types else None
+        
+        return row_count, columns, data_types
     
-    def _infer_data_types(self, csv_path: str, columns: List[str]) -> Dict[str, str]:
+    @staticmethod
+    def _count_remaining_rows(f: TextIO) -> int:
         """
-        Infer data types for CSV columns.
+        Count the CSV records left in a text file positioned at a record start.
+        
+        Text is read in large blocks and records are counted as newlines,
+        which is valid while no quotes (that could hide embedded newlines)
+        or NUL characters appear. From the first block that has one, the
+        rest is counted by csv.reader.
+        
+        Args:
+            f: Text file opened with universal newlines
+            
+        Returns:
+            Number of remaining records, blank lines included
+        """
+        rows = 0
+        carry = ''
+        
+        while block := f.read(CSV_COUNT_BLOCK_SIZE):
+            if '"' in block or '\0' in block:
+                # Finish the current line so csv.reader starts on a line boundary
+                text = carry + block + f.readline()
+                return rows + sum(1 for _ in csv.reader(chain(io.StringIO(text), f)))
+            
+            rows += block.count('\n')
+            carry = block[block.rfind('\n') + 1:] if '\n' in block else carry + block
+        
+        # A last line without a trailing newline is still a record
+        return rows + (1 if carry else 0)
+    
+    def _infer_data_types(self, columns: List[str], sample_rows: List[List[str]]) -> Dict[str, str]:
+        """
+        Infer data types for CSV columns from sampled rows.
         
         Args:
-            csv_path: Path to the CSV file
             columns: List of column names
+            sample_rows: Sampled data rows as lists of values
             
         Returns:
             Dictionary mapping column names to inferred data types
         """
-        data_types = {col: "string" for col in columns}
+        # A repeated column name takes its values from the last such column
+        positions = {col: i for i, col in enumerate(columns)}
+        data_types = {}
         
-        try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                sample_rows = [next(reader, None) for _ in range(min(100, 100))]
+        for col, i in positions.items():
+            types_found = set()
             
-            for col in columns:
-                types_found = set()
-                
-                for row in sample_rows:
-                    if row and col in row:
-                        value = row[col]
-                        
-                        if not value or value.strip() == '':
-                            types_found.add('null')
-                        elif self._is_integer(value):
-                            types_found.add('integer')
-                        elif self._is_float(value):
-                            types_found.add('float')
-                        elif self._is_boolean(value):
-                            types_found.add('boolean')
-                        else:
-                            types_found.add('string')
+            for row in sample_rows:
+                value = row[i] if i < len(row) else None
                 
-                if 'float' in types_found:
-                    data_types[col] = 'float'
-                elif 'integer' in types_found:
-                    data_types[col] = 'integer'
-                elif 'boolean' in types_found:
-                    data_types[col] = 'boolean'
+                if not value or value.strip() == '':
+                    types_found.add('null')
+                elif self._is_integer(value):
+                    types_found.add('integer')
+                elif self._is_float(value):
+                    types_found.add('float')
+                elif self._is_boolean(value):
+                    types_found.add('boolean')
                 else:
-                    data_types[col] = 'string'
-        
-        except Exception as e:
-            self.logger.warning(f"Error inferring data types: {str(e)}")
+                    types_found.add('string')
+            
+            if 'float' in types_found:
+                data_types[col] = 'float'
+            elif 'integer' in types_found:
+                data_types[col] = 'integer'
+            elif 'boolean' in types_found:
+                data_types[col] = 'boolean'
+            else:
+                data_types[col] = 'string'
         
         return data_types
     
     @staticmethod
     def _is_integer(value: str) -> bool:
         """Check if value is an integer."""
-        try:
-            int(value)
-            return True
-        except ValueError:
-            return False
+        return _INTEGER_RE.fullmatch(value) is not None
     
     @staticmethod
     def _is_float(value: str) -> bool:
-        """Check if value is a float."""
-        try:
-            float(value)
-            return '.' in value
-        except ValueError:
-            return False
+        """Check if value is a float (written with a decimal point)."""
+        return _FLOAT_RE.fullmatch(value) is not None
     
     @staticmethod
     def _is_boolean(value: str) -> bool:
         """Check if value is a boolean."""
-        return value.lower() in ['true', 'false', 'yes', 'no', '1', '0']
+        return value.lower() in _BOOLEAN_VALUES
     
     def _update_index(self, version_name: str, metadata: Dict[str, Any]) -> None:
         """
         Update the master versions index.
         
+        The entry is appended to the JSON Lines index log, so earlier
+        entries are never re-read or rewritten.
+        
         Args:
             version_name: Name of the version
             metadata: Metadata dictionary for the version
         """
-        # Load existing index or create new one
-        if os.path.exists(self.index_file):
-            index = load_json(self.index_file)
-        else:
-            index = {"versions": [], "created_at": get_timestamp()}
-        
-        # Add new version to index
         version_entry = {
             "version": version_name,
             "created_at": metadata.get("created_at"),
@@ -283,14 +691,31 @@ class VersionManager:
             "file_hash": metadata.get("file_hash")
         }
         
-        index["versions"].append(version_entry)
-        index["last_updated"] = get_timestamp()
-        
-        # Save updated index
-        save_json(index, self.index_file)
+        append_json_line(version_entry, self.index_log_file)
         
         self.logger.info(f"Updated versions index with {version_name}")
     
+    def iter_index_entries(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the versions index without loading it all at once.
+        
+        Entries from the legacy index JSON file come first, followed by
+        those in the JSON Lines index log.
+        
+        Yields:
+            Index entries (version, created_at, row_count, column_count,
+            quality_score, file_hash), oldest first
+        """
+        try:
+            yield from load_json(self.index_file).get("versions", [])
+        except FileNotFoundError:
+            pass
+        
+        try:
+            yield from iter_json_lines(self.index_log_file)
+        except FileNotFoundError:
+            pass
+    
     def _set_current_version(self, version_name: str) -> None:
         """
         Set the current active version.
@@ -299,65 +724,193 @@ class VersionManager:
             version_name: Name of the version to set as current
         """
         write_text_file(version_name, self.current_version_file)
+        self._current_version_cache = None
         self.logger.info(f"Set current version to {version_name}")
     
     def get_current_version(self) -> Optional[str]:
         """
         Get the current active version.
         
+        The pointer file is only re-read when its modification time or
+        size changes.
+        
         Returns:
             Current version name or None if not set
         """
-        if not os.path.exists(self.current_version_file):
+        try:
+            stat = os.stat(self.current_version_file)
+        except FileNotFoundError:
             return None
         
-        return read_text_file(self.current_version_file).strip()
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+        if self._current_version_cache is not None and self._current_version_cache[0] == cache_key:
+            return self._current_version_cache[1]
+        
+        current_version = read_text_file(self.current_version_file).strip()
+        self._current_version_cache = (cache_key, current_version)
+        
+        return current_version
     
-    def get_all_versions(self) -> List[str]:
+    def scan_versions(self) -> List[str]:
         """
-        Get list of all available versions.
+        Scan the versions directory in a single pass.
+        
+        Uses os.scandir so directory checks come from the directory entries
+        rather than a separate stat per path.
         
         Returns:
             List of version names sorted by version number
         """
         versions = []
         
-        if not os.path.exists(self.versions_dir):
-            return versions
-        
-        for item in os.listdir(self.versions_dir):
-            if item.startswith('v') and os.path.isdir(os.path.join(self.versions_dir, item)):
-                try:
-                    int(item[1:])
-                    versions.append(item)
-                except ValueError:
-                    continue
+        try:
+            with os.scandir(self.versions_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.startswith('v') or not entry.is_dir():
+                        continue
+                    try:
+                        int(name[1:])
+                    except ValueError:
+                        continue
+                    versions.append(name)
+        except FileNotFoundError:
+            return []
         
         # Sort by version number
-        versions.sort(key=lambda x: int(x[1:]))
+        versions.sort(key=lambda name: int(name[1:]))
         
         return versions
     
-    def get_version_metadata(self, version_name: str) -> Dict[str, Any]:
+    def get_all_versions(self) -> List[str]:
+        """
+        Get list of all available versions.
+        
+        The directory is only re-scanned when its modification time changes,
+        i.e. when a version directory is added or removed.
+        
+        Returns:
+            List of version names sorted by version number
+        """
+        try:
+            mtime_ns = os.stat(self.versions_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        
+        if self._versions_cache is not None and self._versions_cache[0] == mtime_ns:
+            return list(self._versions_cache[1])
+        
+        versions = self.scan_versions()
+        
+        self._versions_cache = (mtime_ns, versions)
+        
+        return list(versions)
+    
+    def get_state(self) -> Tuple[List[str], Optional[str]]:
+        """
+        Get all available versions together with the current version.
+        
+        Returns:
+            Tuple of (all_versions, current_version)
+        """
+        return self.get_all_versions(), self.get_current_version()
+    
+    def get_version_metadata(self, version_name: str, include_backups: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get metadata for a specific version.
         
         Args:
             version_name: Name of the version
+            include_backups: Whether to merge pre-rollback backup records
+                from the version's backups sidecar into a "backups" list
             
         Returns:
-            Metadata dictionary
-            
-        Raises:
-            FileNotFoundError: If version or metadata doesn't exist
+            Metadata dictionary, or None if the metadata file is missing
+            or can't be parsed
         """
         metadata_file = os.path.join(self.versions_dir, version_name, "metadata.json")
         
-        if not os.path.exists(metadata_file):
+        try:
+            metadata = load_json(metadata_file)
+        except FileNotFoundError:
             self.logger.error(f"Metadata file not found for {version_name}")
-            raise FileNotFoundError(f"Metadata file not found for {version_name}")
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to read metadata for {version_name}: {str(e)}")
+            return None
         
-        return load_json(metadata_file)
+        if include_backups:
+            # Older releases stored backups inside metadata.json itself
+            backups = metadata.get("backups", [])
+            try:
+                backups.extend(iter_json_lines(os.path.join(self.versions_dir, version_name, BACKUPS_FILE)))
+            except FileNotFoundError:
+                pass
+            if backups:
+                metadata["backups"] = backups
+        
+        return metadata
+    
+    def get_all_metadata(self, version_names: Optional[List[str]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get metadata for several versions in one pass.
+        
+        Metadata files are read concurrently on a small thread pool.
+        
+        Args:
+            version_names: Names of the versions (defaults to all versions)
+            
+        Returns:
+            Dictionary mapping version name to its metadata, or to None if
+            the metadata could not be read
+        """
+        if version_names is None:
+            version_names = self.get_all_versions()
+        
+        if len(version_names) <= 1:
+            return {name: self.get_version_metadata(name) for name in version_names}
+        
+        # Each read is a separate open + parse, so overlap them on threads
+        workers = min(METADATA_READ_WORKERS, len(version_names))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(version_names, executor.map(self.get_version_metadata, version_names)))
+    
+    def get_version_summaries(self, version_names: Optional[List[str]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get listing summaries (created_at, row_count, column_count) for versions.
+        
+        Summaries are taken from the versions index, so a listing reads one
+        file instead of every metadata.json. Versions the index doesn't
+        cover fall back to their metadata file. Index entries record fields
+        the metadata omitted as None; those are left out of the summary, as
+        they are absent from the metadata file.
+        
+        Args:
+            version_names: Names of the versions (defaults to all versions)
+            
+        Returns:
+            Dictionary mapping version name to its summary, or to None if
+            neither the index nor the metadata file could be read
+        """
+        if version_names is None:
+            version_names = self.get_all_versions()
+        
+        try:
+            known = {
+                entry.get("version"): {key: value for key, value in entry.items() if value is not None}
+                for entry in self.iter_index_entries()
+            }
+        except Exception as e:
+            self.logger.warning(f"Failed to read versions index: {str(e)}")
+            known = {}
+        
+        summaries = {name: known.get(name) for name in version_names}
+        
+        missing = [name for name, summary in summaries.items() if summary is None]
+        if missing:
+            summaries.update(self.get_all_metadata(missing))
+        
+        return summaries
     
     def get_version_dataset_path(self, version_name: str) -> str:
         """
@@ -384,3 +937,48 @@ class VersionManager:
                 return os.path.join(version_path, file)
         
         raise FileNotFoundError(f"No dataset file found in {version_path}")
+    
+    def get_versions_bulk(self, version_names: List[str]) -> Dict[str, Tuple[Dict[str, Any], str]]:
+        """
+        Get metadata and dataset path for several versions at once.
+        
+        Each version directory is listed once and its metadata read once,
+        even if the version is requested more than once.
+        
+        Args:
+            version_names: Names of the versions
+            
+        Returns:
+            Dictionary mapping version name to (metadata, dataset_path)
+            
+        Raises:
+            FileNotFoundError: If a version, its metadata or its dataset doesn't exist
+        """
+        versions = {}
+        
+        for version_name in version_names:
+            if version_name in versions:
+                continue
+            
+            version_path = os.path.join(self.versions_dir, version_name)
+            
+            try:
+                filenames = os.listdir(version_path)
+            except FileNotFoundError:
+                self.logger.error(f"Version directory not found: {version_path}")
+                raise FileNotFoundError(f"Version directory not found: {version_path}")
+            
+            if "metadata.json" not in filenames:
+                self.logger.error(f"Metadata file not found for {version_name}")
+                raise FileNotFoundError(f"Metadata file not found for {version_name}")
+            
+            dataset_file = next((f for f in filenames if f.endswith('.csv')), None)
+            if dataset_file is None:
+                raise FileNotFoundError(f"No dataset file found in {version_path}")
+            
+            versions[version_name] = (
+                load_json(os.path.join(version_path, "metadata.json")),
+                os.path.join(version_path, dataset_file)
+            )
+        
+        return versions